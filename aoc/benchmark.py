@@ -0,0 +1,71 @@
+import json
+import pathlib
+import statistics
+from typing import NamedTuple
+
+from aoc.runner import run_day
+
+
+class Stats(NamedTuple):
+    min: float
+    median: float
+    p95: float
+    stddev: float
+    repeats: int
+
+
+class Regression(NamedTuple):
+    day: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1
+
+
+def summarize(samples: list[float]) -> Stats:
+    if len(samples) == 1:
+        p95 = samples[0]
+    else:
+        p95 = statistics.quantiles(samples, n=20, method="inclusive")[18]
+    return Stats(
+        min=min(samples),
+        median=statistics.median(samples),
+        p95=p95,
+        stddev=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        repeats=len(samples),
+    )
+
+
+def benchmark_day(day: str, warmup: int, repeats: int) -> tuple[str, Stats]:
+    for _ in range(warmup):
+        run_day(day)
+    return day, summarize([run_day(day).seconds for _ in range(repeats)])
+
+
+def load_baseline(path: pathlib.Path) -> dict[str, Stats]:
+    if not path.exists():
+        return {}
+    return {day: Stats(**stats) for day, stats in json.loads(path.read_text()).items()}
+
+
+def save_baseline(path: pathlib.Path, results: dict[str, Stats]) -> None:
+    baseline = load_baseline(path) | results
+    path.write_text(
+        json.dumps(
+            {day: stats._asdict() for day, stats in sorted(baseline.items())},
+            indent=2,
+        )
+        + "\n"
+    )
+
+
+def find_regressions(
+    results: dict[str, Stats], baseline: dict[str, Stats], threshold: float
+) -> list[Regression]:
+    return [
+        Regression(day=day, baseline=baseline[day].median, current=stats.median)
+        for day, stats in results.items()
+        if day in baseline and stats.median > baseline[day].median * (1 + threshold)
+    ]
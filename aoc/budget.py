@@ -0,0 +1,209 @@
+import collections
+import contextlib
+import math
+import multiprocessing
+import os
+import pathlib
+import signal
+import sys
+import threading
+import time
+import traceback
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Iterator, NamedTuple
+
+from aoc.runner import SOLUTIONS_DIR, DayResult, run_day
+
+type Stack = tuple[str, ...]
+
+
+class Overrun(NamedTuple):
+    day: str
+    part: str
+    budget_kind: str
+    budget: float
+    seconds: float
+    interval: float
+    total_samples: int
+    stacks: list[tuple[Stack, int]]
+
+
+class BudgetExceededError(Exception):
+    def __init__(self, overrun: Overrun) -> None:
+        super().__init__(
+            f"{overrun.day} {overrun.part} went over its {overrun.budget} second "
+            f"{overrun.budget_kind} budget"
+        )
+        self.overrun = overrun
+
+
+def _stack(frame) -> Stack:
+    frames = traceback.extract_stack(frame)
+    solutions = str(SOLUTIONS_DIR.resolve())
+    first = next(
+        (i for i, f in enumerate(frames) if f.filename.startswith(solutions)), 0
+    )
+    return tuple(
+        f"{os.path.relpath(f.filename)}:{f.lineno} in {f.name}" for f in frames[first:]
+    )
+
+
+def _sample(
+    day: str,
+    main_thread: int,
+    current: list,
+    budget: float,
+    part_budget: float,
+    interval: float,
+    top: int,
+    stop: threading.Event,
+    send: Callable[[tuple[str, Any]], None],
+) -> None:
+    day_start = time.perf_counter()
+    stacks = collections.Counter[Stack]()
+    while not stop.wait(interval):
+        if (frame := sys._current_frames().get(main_thread)) is not None:
+            stacks[_stack(frame)] += 1
+        now = time.perf_counter()
+        part, part_start = current
+        if now - day_start > budget:
+            kind, limit, seconds = "day", budget, now - day_start
+        elif now - part_start > part_budget:
+            kind, limit, seconds = "part", part_budget, now - part_start
+        else:
+            continue
+        overrun = Overrun(
+            day=day,
+            part=part,
+            budget_kind=kind,
+            budget=limit,
+            seconds=seconds,
+            interval=interval,
+            total_samples=stacks.total(),
+            stacks=stacks.most_common(top),
+        )
+        send(("overrun", overrun))
+        return
+
+
+def _run_child(
+    day: str,
+    solutions_dir: pathlib.Path,
+    budget: float,
+    part_budget: float,
+    interval: float,
+    top: int,
+    count: bool,
+    sender: Connection,
+) -> None:
+    # Lead a new process group, so that the parent can kill this process together
+    # with any pool workers it starts.
+    os.setsid()
+    current = ["parse", time.perf_counter()]
+    # The sampler and the main thread both report to the parent.
+    lock = threading.Lock()
+
+    def send(message: tuple[str, Any]) -> None:
+        with lock:
+            sender.send(message)
+
+    @contextlib.contextmanager
+    def hook(part: str) -> Iterator[None]:
+        current[:] = part, time.perf_counter()
+        send(("part", part))
+        yield
+
+    stop = threading.Event()
+    sampler = threading.Thread(
+        target=_sample,
+        args=(
+            day,
+            threading.get_ident(),
+            current,
+            budget,
+            part_budget,
+            interval,
+            top,
+            stop,
+            send,
+        ),
+        daemon=True,
+    )
+    sampler.start()
+    try:
+        message = ("done", run_day(day, solutions_dir, hook, count))
+    except Exception as error:
+        message = ("error", error)
+    stop.set()
+    sampler.join()
+    try:
+        send(message)
+    except Exception:
+        send(("error", RuntimeError(traceback.format_exc())))
+
+
+def budgeted_run_day(
+    day: str,
+    solutions_dir: pathlib.Path = SOLUTIONS_DIR,
+    budget: float = math.inf,
+    part_budget: float = math.inf,
+    interval: float = 0.05,
+    top: int = 5,
+    count: bool = False,
+) -> DayResult:
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=_run_child,
+        args=(day, solutions_dir, budget, part_budget, interval, top, count, sender),
+    )
+    process.start()
+    sender.close()
+    # The child reports its own overruns. These deadlines only catch a child that is
+    # too wedged to do so, e.g. stuck in C code that holds the GIL, for which it
+    # reports when each part starts.
+    slack = 1 + 10 * interval
+    start = part_start = time.perf_counter()
+    part = "parse"
+    kind: str
+    payload: Any
+    while True:
+        now = time.perf_counter()
+        timeout = min(start + budget, part_start + part_budget) + slack - now
+        if not receiver.poll(None if math.isinf(timeout) else max(timeout, 0)):
+            kind, payload = "wedged", None
+            break
+        try:
+            kind, payload = receiver.recv()
+        except EOFError:
+            kind, payload = "exit", None
+            break
+        if kind != "part":
+            break
+        part, part_start = payload, time.perf_counter()
+    if kind in ("wedged", "overrun") and process.pid is not None:
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(process.pid, signal.SIGKILL)
+    process.join()
+    if kind == "wedged":
+        now = time.perf_counter()
+        if now - start > budget + slack:
+            overrun = Overrun(day, part, "day", budget, now - start, interval, 0, [])
+        else:
+            overrun = Overrun(
+                day, part, "part", part_budget, now - part_start, interval, 0, []
+            )
+        raise BudgetExceededError(overrun)
+    if kind == "overrun":
+        raise BudgetExceededError(payload)
+    if kind == "exit":
+        raise RuntimeError(f"{day} exited with {process.exitcode}")
+    if kind == "error":
+        raise payload
+    return payload
+
+
+def within_budget(run: Callable[[str], DayResult], day: str) -> DayResult | Overrun:
+    try:
+        return run(day)
+    except BudgetExceededError as error:
+        return error.overrun
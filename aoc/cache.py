@@ -0,0 +1,54 @@
+import hashlib
+import json
+import pathlib
+from typing import Callable
+
+from aoc.runner import SOLUTIONS_DIR, DayResult, Phase, run_day
+
+CACHE_DIR = pathlib.Path(".cache")
+SHARED_SOURCES = pathlib.Path(__file__).parent
+
+
+def day_key(
+    day_dir: pathlib.Path, shared_sources: pathlib.Path = SHARED_SOURCES
+) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(
+        [path for path in day_dir.iterdir() if path.is_file()]
+        + list(shared_sources.glob("*.py"))
+    ):
+        digest.update(f"{path.name}\0{path.stat().st_size}\0".encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def load_result(path: pathlib.Path) -> DayResult:
+    result = json.loads(path.read_text())
+    return DayResult(
+        day=result["day"],
+        output=result["output"],
+        seconds=result["seconds"],
+        phases=tuple(Phase(*phase) for phase in result["phases"]),
+        cached=True,
+    )
+
+
+def save_result(path: pathlib.Path, result: DayResult) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for stale in path.parent.glob(f"{result.day}-*.json"):
+        stale.unlink()
+    path.write_text(json.dumps(result._replace(cached=False)._asdict()) + "\n")
+
+
+def cached_run_day(
+    day: str,
+    cache_dir: pathlib.Path = CACHE_DIR,
+    solutions_dir: pathlib.Path = SOLUTIONS_DIR,
+    run: Callable[[str, pathlib.Path], DayResult] = run_day,
+) -> DayResult:
+    path = cache_dir / f"{day}-{day_key(solutions_dir / day)}.json"
+    if path.exists():
+        return load_result(path)
+    result = run(day, solutions_dir)
+    save_result(path, result)
+    return result
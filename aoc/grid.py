@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import pathlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# The byte of the sentinel border, which no puzzle input uses.
+OUTSIDE = 0
+
+# Directions index Grid.offsets, turning clockwise.
+NORTH, EAST, SOUTH, WEST = range(4)
+
+
+def pack(index: int, direction: int) -> int:
+    # A position and a direction in one int, e.g. a state of a search.
+    return index << 2 | direction
+
+
+def unpack(state: int) -> tuple[int, int]:
+    return state >> 2, state & 3
+
+
+class Grid:
+    # One byte per cell, row after row, so that reading a cell returns a small int
+    # instead of building an object. With a border of sentinel cells, neighbours of
+    # the outermost cells can be read without checking bounds.
+    def __init__(self, cells: bytearray, rows: int, cols: int, border: int = 0):
+        self.cells = cells
+        self.rows = rows
+        self.cols = cols
+        self.border = border
+        self.width = cols + 2 * border
+        # Flat index deltas to the neighbours in each direction.
+        self.offsets = (-self.width, 1, self.width, -1)
+
+    @classmethod
+    def from_lines(cls, lines: list[bytes], border: int = 0) -> Grid:
+        cols = len(lines[0])
+        if any(len(line) != cols for line in lines):
+            raise ValueError("rows of different lengths")
+        edge = bytes((cols + 2 * border) * border)
+        side = bytes(border)
+        cells = bytearray(edge)
+        for line in lines:
+            cells += side + line + side
+        cells += edge
+        return cls(cells, len(lines), cols, border)
+
+    @classmethod
+    def from_text(cls, text: str | bytes, border: int = 0) -> Grid:
+        if isinstance(text, str):
+            text = text.encode()
+        return cls.from_lines(text.rstrip().splitlines(), border)
+
+    @classmethod
+    def from_file(cls, path: pathlib.Path, border: int = 0) -> Grid:
+        return cls.from_text(path.read_bytes(), border)
+
+    def index(self, row: int, col: int) -> int:
+        return (row + self.border) * self.width + col + self.border
+
+    def position(self, index: int) -> tuple[int, int]:
+        row, col = divmod(index, self.width)
+        return row - self.border, col - self.border
+
+    def __getitem__(self, position: tuple[int, int]) -> int:
+        return self.cells[self.index(*position)]
+
+    def __setitem__(self, position: tuple[int, int], value: int) -> None:
+        self.cells[self.index(*position)] = value
+
+    def locate(self, char: str) -> int:
+        if (index := self.cells.find(ord(char))) == -1:
+            raise ValueError(f"{char!r} not found")
+        return index
+
+    def locate_all(self, char: str) -> list[int]:
+        indices: list[int] = []
+        byte = ord(char)
+        index = self.cells.find(byte)
+        while index != -1:
+            indices.append(index)
+            index = self.cells.find(byte, index + 1)
+        return indices
+
+    def row(self, row: int) -> memoryview:
+        start = self.index(row, 0)
+        return memoryview(self.cells)[start : start + self.cols]
+
+    def column(self, col: int) -> memoryview:
+        start = self.index(0, col)
+        return memoryview(self.cells)[start :: self.width][: self.rows]
+
+    def array(self) -> np.ndarray:
+        # A rows by cols view of the cells without the border, sharing their memory.
+        import numpy as np
+
+        cells = np.frombuffer(self.cells, dtype=np.uint8).reshape(-1, self.width)
+        return cells[
+            self.border : self.border + self.rows, self.border : self.border + self.cols
+        ]
+
+    def copy(self) -> Grid:
+        return Grid(self.cells.copy(), self.rows, self.cols, self.border)
+
+    def __str__(self) -> str:
+        return "\n".join(bytes(self.row(i)).decode() for i in range(self.rows))
@@ -0,0 +1,64 @@
+import mmap
+import pathlib
+from typing import NamedTuple
+
+import numpy as np
+
+# Files at least this big are mapped instead of read into memory.
+MMAP_THRESHOLD = 2**20
+
+# The most digits of an integer that always fits in an int64.
+MAX_DIGITS = 18
+
+
+class Ints(NamedTuple):
+    # All the integers of a file, with those of line i at values[offsets[i] :
+    # offsets[i + 1]], so that ragged lines need no list per line.
+    values: np.ndarray
+    offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def line(self, i: int) -> np.ndarray:
+        return self.values[self.offsets[i] : self.offsets[i + 1]]
+
+    def lines(self) -> list[list[int]]:
+        values = self.values.tolist()
+        offsets = self.offsets.tolist()
+        return [values[start:end] for start, end in zip(offsets, offsets[1:])]
+
+
+def parse_ints(data: bytes | mmap.mmap | np.ndarray) -> Ints:
+    data = np.frombuffer(data, dtype=np.uint8)
+    is_digit = (data >= ord("0")) & (data <= ord("9"))
+    edges = np.flatnonzero(np.diff(is_digit, prepend=False, append=False))
+    starts, ends = edges[::2], edges[1::2]
+    # Each digit times ten to the power of the digits after it in its number, summed
+    # per number.
+    lengths = ends - starts
+    if len(lengths) and lengths.max() > MAX_DIGITS:
+        # The traceback must not hold a view of a mapped file, which could not close.
+        del data
+        raise ValueError(f"integers of more than {MAX_DIGITS} digits do not fit int64")
+    digits = np.flatnonzero(is_digit)
+    exponents = np.repeat(ends - 1, lengths) - digits
+    terms = (data[digits] - ord("0")).astype(np.int64) * 10**exponents
+    values = terms
+    if len(terms):
+        values = np.add.reduceat(terms, np.cumsum(lengths) - lengths)
+    negative = data[np.maximum(starts - 1, 0)] == ord("-")
+    values[negative & (starts > 0)] *= -1
+    newlines = np.flatnonzero(data == ord("\n"))
+    if len(data) and data[-1] != ord("\n"):
+        newlines = np.append(newlines, len(data))
+    offsets = np.concatenate(([0], np.searchsorted(starts, newlines)))
+    return Ints(values=values, offsets=offsets)
+
+
+def read_ints(path: pathlib.Path) -> Ints:
+    if path.stat().st_size < MMAP_THRESHOLD:
+        return parse_ints(path.read_bytes())
+    with path.open("rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return parse_ints(data)
@@ -0,0 +1,113 @@
+import contextlib
+import resource
+import sys
+import threading
+import tracemalloc
+from typing import Iterator, NamedTuple
+
+from aoc import metrics, runner
+from aoc.runner import DayResult, no_hook, run_day
+
+# ru_maxrss is reported in kibibytes on Linux but in bytes on macOS.
+MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+class AllocationSite(NamedTuple):
+    location: str
+    size: int
+    blocks: int
+
+
+class PartMemory(NamedTuple):
+    part: str
+    peak: int
+    sites: list[AllocationSite]
+
+
+class DayMemory(NamedTuple):
+    result: DayResult
+    max_rss: int
+    max_rss_workers: int
+    parts: list[PartMemory]
+
+
+def allocation_sites(snapshot: tracemalloc.Snapshot, top: int) -> list[AllocationSite]:
+    snapshot = snapshot.filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            # The runner's own bookkeeping.
+            tracemalloc.Filter(False, metrics.__file__),
+            tracemalloc.Filter(False, runner.__file__),
+            tracemalloc.Filter(False, threading.__file__),
+        ]
+    )
+    return [
+        AllocationSite(
+            location=f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            size=stat.size,
+            blocks=stat.count,
+        )
+        for stat in snapshot.statistics("lineno")[:top]
+    ]
+
+
+class PeakSnapshots:
+    # Polls the traced memory from a thread and snapshots it at each new high (by
+    # more than a tenth), so that the sites are those of the peak rather than what
+    # is left when the part returns.
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.size = 0
+        self.snapshot: tracemalloc.Snapshot | None = None
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.poll, daemon=True)
+
+    def take(self) -> None:
+        current, _ = tracemalloc.get_traced_memory()
+        if self.snapshot is None or current > self.size * 1.1:
+            self.size = current
+            self.snapshot = tracemalloc.take_snapshot()
+
+    def poll(self) -> None:
+        while not self.stop.wait(self.interval):
+            self.take()
+
+    def __enter__(self) -> "PeakSnapshots":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop.set()
+        self.thread.join()
+        # A part shorter than the interval still gets a snapshot.
+        self.take()
+
+
+def measure_day(day: str, trace: bool = False, top: int = 15) -> DayMemory:
+    # Per part, keep the run (over all the inputs) with the highest peak, with the
+    # allocation sites taken closest to that peak.
+    parts: dict[str, PartMemory] = {}
+
+    @contextlib.contextmanager
+    def hook(part: str) -> Iterator[None]:
+        tracemalloc.start()
+        try:
+            with PeakSnapshots() as snapshots:
+                yield
+            _, peak = tracemalloc.get_traced_memory()
+            if snapshots.snapshot and (part not in parts or peak > parts[part].peak):
+                sites = allocation_sites(snapshots.snapshot, top)
+                parts[part] = PartMemory(part=part, peak=peak, sites=sites)
+        finally:
+            tracemalloc.stop()
+
+    result = run_day(day, hook=hook if trace else no_hook)
+    return DayMemory(
+        result=result,
+        max_rss=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * MAXRSS_UNIT,
+        max_rss_workers=(
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * MAXRSS_UNIT
+        ),
+        parts=list(parts.values()),
+    )
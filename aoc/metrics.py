@@ -0,0 +1,59 @@
+import collections
+import contextlib
+from typing import Any, Callable, Iterable, Iterator
+
+# None unless counting, so that add() is a single check when disabled. Hot loops
+# count in a local variable and add() it once they are done, so that the loop itself
+# pays no more than an integer increment.
+_counts: collections.Counter[str] | None = None
+
+
+def enabled() -> bool:
+    return _counts is not None
+
+
+def add(name: str, count: int = 1) -> None:
+    if _counts is not None:
+        _counts[name] += count
+
+
+@contextlib.contextmanager
+def counting(enable: bool = True) -> Iterator[collections.Counter[str]]:
+    global _counts
+    counts = collections.Counter[str]()
+    previous = _counts
+    if enable:
+        _counts = counts
+    try:
+        yield counts
+    finally:
+        _counts = previous
+
+
+class _Counted:
+    def __init__(self, function: Callable[..., Any]) -> None:
+        self.function = function
+
+    def __call__(self, *args: Any) -> tuple[Any, collections.Counter[str]]:
+        with counting() as counts:
+            result = self.function(*args)
+        return result, counts
+
+
+def tracked(function: Callable[..., Any]) -> Callable[..., Any]:
+    # Counts made in pool workers are lost unless they travel back with the results,
+    # which gather() then adds up.
+    return _Counted(function) if enabled() else function
+
+
+def gather(results: Iterable[Any]) -> Iterable[Any]:
+    if not enabled():
+        return results
+    return (_add_all(result) for result in results)
+
+
+def _add_all(result: tuple[Any, collections.Counter[str]]) -> Any:
+    value, counts = result
+    for name, count in counts.items():
+        add(name, count)
+    return value
@@ -0,0 +1,57 @@
+import concurrent.futures
+import contextlib
+import multiprocessing
+import os
+from typing import Iterator
+
+# Imported once by the forkserver, so that every worker forked from it starts with
+# them already loaded.
+PRELOAD = ("numpy", "tqdm")
+
+_shared: "SharedPool | None" = None
+
+
+class SharedPool:
+    def __init__(self, preload: tuple[str, ...], max_workers: int | None) -> None:
+        self.preload = preload
+        self.max_workers = max_workers
+        self.owner = os.getpid()
+        self.executor: concurrent.futures.ProcessPoolExecutor | None = None
+
+    def get(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self.executor is None:
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(list(self.preload))
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                self.max_workers, mp_context=context
+            )
+        return self.executor
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+
+
+@contextlib.contextmanager
+def shared_pool(
+    preload: tuple[str, ...] = PRELOAD, max_workers: int | None = None
+) -> Iterator[SharedPool]:
+    # The workers are only started when a day first borrows the pool.
+    global _shared
+    _shared = SharedPool(preload, max_workers)
+    try:
+        yield _shared
+    finally:
+        _shared.shutdown()
+        _shared = None
+
+
+@contextlib.contextmanager
+def pool() -> Iterator[concurrent.futures.Executor]:
+    # Processes forked from the owner, like --jobs workers, inherit a pool they cannot
+    # use, so they get a pool of their own as does a day run on its own.
+    if _shared is not None and _shared.owner == os.getpid():
+        yield _shared.get()
+    else:
+        with concurrent.futures.ProcessPoolExecutor() as executor:
+            yield executor
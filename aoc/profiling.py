@@ -0,0 +1,156 @@
+import collections
+import concurrent.futures
+import contextlib
+import cProfile
+import functools
+import multiprocessing.util
+import os
+import pathlib
+import pstats
+import shutil
+import tempfile
+import uuid
+from typing import Any, Callable, ContextManager, Iterator, NamedTuple
+
+from aoc.runner import DayResult, run_day
+
+PROFILE_DIR = pathlib.Path("profiles")
+
+# The profiler enabled in this process, so that pool workers forked while it is
+# running can switch their inherited copy off before starting their own.
+_active: cProfile.Profile | None = None
+
+
+class Hotspot(NamedTuple):
+    function: str
+    calls: int
+    self_seconds: float
+    cumulative_seconds: float
+
+
+class PartProfile(NamedTuple):
+    part: str
+    path: pathlib.Path
+    by_cumulative: list[Hotspot]
+    by_self: list[Hotspot]
+
+
+class DayProfile(NamedTuple):
+    result: DayResult
+    parts: list[PartProfile]
+
+
+def _dump(profiler: cProfile.Profile, path: pathlib.Path) -> None:
+    profiler.disable()
+    profiler.dump_stats(path)
+
+
+def _profile_worker(
+    worker_dir: pathlib.Path,
+    initializer: Callable[..., object] | None,
+    initargs: tuple[Any, ...],
+) -> None:
+    if _active is not None:
+        _active.disable()
+    profiler = cProfile.Profile()
+    multiprocessing.util.Finalize(
+        None,
+        _dump,
+        args=(profiler, worker_dir / f"{os.getpid()}-{uuid.uuid4().hex}.pstats"),
+        exitpriority=0,
+    )
+    profiler.enable()
+    if initializer is not None:
+        initializer(*initargs)
+
+
+class ProfiledProcessPoolExecutor(concurrent.futures.ProcessPoolExecutor):
+    def __init__(
+        self,
+        worker_dir: pathlib.Path,
+        max_workers: int | None = None,
+        mp_context: Any = None,
+        initializer: Callable[..., object] | None = None,
+        initargs: tuple[Any, ...] = (),
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(
+            max_workers,
+            mp_context,
+            initializer=_profile_worker,
+            initargs=(worker_dir, initializer, initargs),
+            **kwargs,
+        )
+
+
+@contextlib.contextmanager
+def profiled(profiler: cProfile.Profile, worker_dir: pathlib.Path) -> Iterator[None]:
+    global _active
+    original = concurrent.futures.ProcessPoolExecutor
+    concurrent.futures.ProcessPoolExecutor = functools.partial(  # pyright: ignore[reportAttributeAccessIssue]
+        ProfiledProcessPoolExecutor, worker_dir
+    )
+    _active = profiler
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _active = None
+        concurrent.futures.ProcessPoolExecutor = original
+
+
+def describe(function: tuple[str, int, str]) -> str:
+    # file:line(name), or only the name of a built-in, which has no file.
+    filename, line, name = function
+    if (filename, line) == ("~", 0):
+        return name
+    return f"{filename}:{line}({name})"
+
+
+def hotspots(stats: pstats.Stats, key: str, top: int) -> list[Hotspot]:
+    rows = [
+        Hotspot(
+            function=describe(function),
+            calls=calls,
+            self_seconds=self_seconds,
+            cumulative_seconds=cumulative_seconds,
+        )
+        for function, (_, calls, self_seconds, cumulative_seconds, _) in (
+            stats.stats.items()  # pyright: ignore[reportAttributeAccessIssue]
+        )
+    ]
+    return sorted(rows, key=lambda row: getattr(row, key), reverse=True)[:top]
+
+
+def profile_day(
+    day: str, profile_dir: pathlib.Path = PROFILE_DIR, top: int = 15
+) -> DayProfile:
+    profilers = collections.defaultdict[str, cProfile.Profile](cProfile.Profile)
+    workers_dir = pathlib.Path(tempfile.mkdtemp(prefix=f"{day}-workers-"))
+    try:
+
+        def hook(part: str) -> ContextManager[None]:
+            (workers_dir / part).mkdir(exist_ok=True)
+            return profiled(profilers[part], workers_dir / part)
+
+        result = run_day(day, hook=hook)
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        parts: list[PartProfile] = []
+        for part, profiler in profilers.items():
+            stats = pstats.Stats(profiler)
+            for worker_stats in sorted((workers_dir / part).glob("*.pstats")):
+                stats.add(str(worker_stats))
+            path = profile_dir / f"{day}-{part}.pstats"
+            stats.dump_stats(path)
+            parts.append(
+                PartProfile(
+                    part=part,
+                    path=path,
+                    by_cumulative=hotspots(stats, "cumulative_seconds", top),
+                    by_self=hotspots(stats, "self_seconds", top),
+                )
+            )
+    finally:
+        shutil.rmtree(workers_dir)
+    return DayProfile(result=result, parts=parts)
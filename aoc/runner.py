@@ -0,0 +1,100 @@
+import contextlib
+import importlib
+import io
+import pathlib
+import time
+from types import ModuleType
+from typing import Any, Callable, ContextManager, NamedTuple
+
+from aoc import metrics
+
+SOLUTIONS_DIR = pathlib.Path("solutions")
+PROTOCOL = ("parse", "part1", "part2", "ANSWERS")
+
+
+class WrongAnswerError(Exception):
+    pass
+
+
+class Phase(NamedTuple):
+    input: str
+    name: str
+    seconds: float
+    counts: dict[str, int] = {}
+
+
+class DayResult(NamedTuple):
+    day: str
+    output: str
+    seconds: float
+    phases: tuple[Phase, ...] = ()
+    cached: bool = False
+
+
+def find_days(solutions_dir: pathlib.Path = SOLUTIONS_DIR) -> list[str]:
+    return sorted(day.name for day in solutions_dir.glob("day*") if day.is_dir())
+
+
+def implements_protocol(module: ModuleType) -> bool:
+    return all(hasattr(module, name) for name in PROTOCOL)
+
+
+def timed(function: Callable, *args: Any) -> tuple[Any, float]:
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def no_hook(phase: str) -> ContextManager[None]:
+    return contextlib.nullcontext()
+
+
+def run_phases(
+    module: ModuleType,
+    directory: pathlib.Path,
+    hook: Callable[[str], ContextManager[None]] = no_hook,
+    count: bool = False,
+) -> list[Phase]:
+    phases: list[Phase] = []
+    for name, answers in module.ANSWERS.items():
+        with hook("parse"), metrics.counting(count) as counts:
+            data, seconds = timed(module.parse, directory / name)
+        phases.append(Phase(name, "parse", seconds, dict(counts)))
+        for part, expected in zip(("part1", "part2"), answers):
+            if expected is None:
+                continue
+            with hook(part), metrics.counting(count) as counts:
+                answer, seconds = timed(getattr(module, part), data)
+            if answer != expected:
+                raise WrongAnswerError(
+                    f"{directory.name} {part} on {name}: "
+                    f"expected {expected}, got {answer}"
+                )
+            phases.append(Phase(name, part, seconds, dict(counts)))
+    print("All tests passed.")
+    return phases
+
+
+def run_day(
+    day: str,
+    solutions_dir: pathlib.Path = SOLUTIONS_DIR,
+    hook: Callable[[str], ContextManager[None]] = no_hook,
+    count: bool = False,
+) -> DayResult:
+    module = importlib.import_module(f"solutions.{day}.solution")
+    output = io.StringIO()
+    phases: list[Phase] = []
+    with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        if implements_protocol(module):
+            phases = run_phases(module, solutions_dir / day, hook, count)
+        else:
+            with hook("main"), metrics.counting(count) as counts:
+                module.main(solutions_dir / day)
+            if counts:
+                seconds = time.perf_counter() - start
+                phases = [Phase("main", "main", seconds, dict(counts))]
+        seconds = time.perf_counter() - start
+    return DayResult(
+        day=day, output=output.getvalue(), seconds=seconds, phases=tuple(phases)
+    )
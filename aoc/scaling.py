@@ -0,0 +1,68 @@
+import collections
+import contextlib
+import importlib
+import io
+import math
+import pathlib
+import random
+import tempfile
+from typing import NamedTuple
+
+from aoc.runner import implements_protocol, timed
+
+SIZES = (250, 500, 1000, 2000, 4000)
+
+
+class Curve(NamedTuple):
+    phase: str
+    input_sizes: list[int]
+    seconds: list[float]
+    exponent: float
+
+
+def fit_exponent(input_sizes: list[int], seconds: list[float]) -> float:
+    # Least squares slope of log(seconds) against log(input size), i.e. k in
+    # seconds ~ size^k.
+    xs = [math.log(size) for size in input_sizes]
+    ys = [math.log(max(second, 1e-9)) for second in seconds]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if variance == 0:
+        return math.nan
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+def scaling_curves(
+    day: str, sizes: tuple[int, ...] = SIZES, seed: int = 0, repeats: int = 3
+) -> list[Curve] | None:
+    module = importlib.import_module(f"solutions.{day}.solution")
+    if not (implements_protocol(module) and hasattr(module, "generate")):
+        return None
+    input_sizes: list[int] = []
+    seconds = collections.defaultdict[str, list[float]](list)
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        contextlib.redirect_stdout(io.StringIO()),
+    ):
+        for size in sizes:
+            path = pathlib.Path(tmp) / f"{size}.txt"
+            path.write_text(module.generate(size, random.Random(seed)))
+            input_sizes.append(path.stat().st_size)
+            best = dict.fromkeys(("parse", "part1", "part2"), math.inf)
+            for _ in range(repeats):
+                data, elapsed = timed(module.parse, path)
+                best["parse"] = min(best["parse"], elapsed)
+                for part in ("part1", "part2"):
+                    _, elapsed = timed(getattr(module, part), data)
+                    best[part] = min(best[part], elapsed)
+            for phase in ("parse", "part1", "part2"):
+                seconds[phase].append(best[phase])
+    return [
+        Curve(
+            phase=phase,
+            input_sizes=input_sizes,
+            seconds=times,
+            exponent=fit_exponent(input_sizes, times),
+        )
+        for phase, times in seconds.items()
+    ]
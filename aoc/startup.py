@@ -0,0 +1,41 @@
+import subprocess
+import sys
+from typing import NamedTuple
+
+
+class ImportTime(NamedTuple):
+    module: str
+    depth: int
+    self_seconds: float
+    cumulative_seconds: float
+
+
+def import_times(module: str) -> list[ImportTime]:
+    # Import the module in a fresh interpreter, exactly like -X importtime would, so
+    # that nothing is already cached in sys.modules.
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: list[ImportTime] = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if not self_us.strip().isdigit():
+            continue
+        times.append(
+            ImportTime(
+                module=name.strip(),
+                depth=(len(name) - len(name.lstrip()) - 1) // 2,
+                self_seconds=int(self_us) / 1e6,
+                cumulative_seconds=int(cumulative_us) / 1e6,
+            )
+        )
+    return times
+
+
+def total_seconds(times: list[ImportTime]) -> float:
+    return sum(time.cumulative_seconds for time in times if time.depth == 0)
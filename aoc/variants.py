@@ -0,0 +1,66 @@
+import importlib
+from typing import Any, Callable, NamedTuple
+
+from aoc.benchmark import Stats, summarize
+from aoc.runner import SOLUTIONS_DIR, implements_protocol, timed
+
+REFERENCE = "solution"
+
+
+class Timing(NamedTuple):
+    name: str
+    answer: Any
+    stats: Stats
+
+
+class Race(NamedTuple):
+    input: str
+    part: str
+    expected: Any
+    timings: list[Timing]
+
+    @property
+    def agrees(self) -> bool:
+        reference = self.timings[0].answer
+        return all(timing.answer == reference for timing in self.timings) and (
+            self.expected is None or reference == self.expected
+        )
+
+
+def find_variants(day: str) -> dict[str, dict[str, Callable[[Any], Any]]]:
+    variants: dict[str, dict[str, Callable[[Any], Any]]] = {}
+    for path in sorted((SOLUTIONS_DIR / day).glob("*.py")):
+        module = importlib.import_module(f"solutions.{day}.{path.stem}")
+        for part, implementations in getattr(module, "VARIANTS", {}).items():
+            for name, implementation in implementations.items():
+                if name == REFERENCE or name in variants.get(part, {}):
+                    raise ValueError(f"{day} {part} variant {name} is not unique")
+                variants.setdefault(part, {})[name] = implementation
+    return variants
+
+
+def race_day(day: str, warmup: int = 1, repeats: int = 5) -> list[Race]:
+    module = importlib.import_module(f"solutions.{day}.solution")
+    variants = find_variants(day)
+    if not variants:
+        return []
+    if not implements_protocol(module):
+        raise ValueError(f"{day} has variants but does not implement the protocol")
+    races: list[Race] = []
+    for name, answers in module.ANSWERS.items():
+        data = module.parse(SOLUTIONS_DIR / day / name)
+        for part, expected in zip(("part1", "part2"), answers):
+            if part not in variants:
+                continue
+            timings: list[Timing] = []
+            implementations = {REFERENCE: getattr(module, part)} | variants[part]
+            for variant, implementation in implementations.items():
+                for _ in range(warmup):
+                    implementation(data)
+                answer, samples = None, []
+                for _ in range(repeats):
+                    answer, seconds = timed(implementation, data)
+                    samples.append(seconds)
+                timings.append(Timing(variant, answer, summarize(samples)))
+            races.append(Race(name, part, expected, timings))
+    return races
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import collections
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Where a word starts, as row and column, and the row and column steps along it.
+type Match = tuple[int, int, int, int]
+
+
+class Automaton:
+    # Aho-Corasick: a trie of the patterns in which every node also links to the
+    # longest proper suffix of its path that is in the trie, so that a text is scanned
+    # once for all of them.
+    def __init__(self, patterns: list[bytes]) -> None:
+        self.lengths = [len(pattern) for pattern in patterns]
+        self.goto: list[dict[int, int]] = [{}]
+        self.fail = [0]
+        self.out: list[list[int]] = [[]]
+        for i, pattern in enumerate(patterns):
+            if not pattern:
+                raise ValueError("empty pattern")
+            node = 0
+            for byte in pattern:
+                if byte not in self.goto[node]:
+                    self.goto[node][byte] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = self.goto[node][byte]
+            self.out[node].append(i)
+        # Breadth first, so that the suffix a node links to is already done.
+        queue = collections.deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for byte, child in self.goto[node].items():
+                queue.append(child)
+                fail = self.fail[node]
+                while fail and byte not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[child] = self.goto[fail].get(byte, 0)
+                self.out[child] += self.out[self.fail[child]]
+
+    def search(self, text: bytes) -> Iterator[tuple[int, int]]:
+        # The index of the last byte and the pattern of every occurrence in text.
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for end, byte in enumerate(text):
+            while node and byte not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(byte, 0)
+            for pattern in out[node]:
+                yield end, pattern
+
+
+def lines(matrix: np.ndarray) -> Iterator[tuple[bytes, int, int, int, int]]:
+    # Every row, column, diagonal and anti-diagonal, with the row and column it
+    # starts from and the row and column steps along it.
+    n, m = matrix.shape
+    for i in range(n):
+        yield matrix[i].tobytes(), i, 0, 0, 1
+    for j in range(m):
+        yield matrix[:, j].tobytes(), 0, j, 1, 0
+    flipped = matrix[:, ::-1]
+    for k in range(-n + 1, m):
+        yield matrix.diagonal(k).tobytes(), max(-k, 0), max(k, 0), 1, 1
+        yield flipped.diagonal(k).tobytes(), max(-k, 0), m - 1 - max(k, 0), 1, -1
+
+
+def find_words(matrix: np.ndarray, words: list[bytes]) -> dict[bytes, list[Match]]:
+    # Every occurrence of the words in any of the 8 directions, in one pass over the
+    # lines of the grid. Each word is also searched for reversed, which finds it
+    # going the other way along the line.
+    words = list(dict.fromkeys(words))
+    automaton = Automaton(words + [word[::-1] for word in words])
+    found: dict[bytes, list[Match]] = {word: [] for word in words}
+    for line, row, col, dr, dc in lines(matrix):
+        for end, pattern in automaton.search(line):
+            word = words[pattern % len(words)]
+            if pattern < len(words):
+                t, step = end - len(word) + 1, 1
+            else:
+                t, step = end, -1
+            found[word].append((row + t * dr, col + t * dc, step * dr, step * dc))
+    return found
@@ -3,7 +3,10 @@ import pathlib
 import click
 
 SOLUTION = """\
-def main() -> None:
+import pathlib
+
+
+def main(directory: pathlib.Path = pathlib.Path(__file__).parent) -> None:
     print("All tests passed.")
 
 
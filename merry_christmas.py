@@ -1,31 +1,597 @@
-import importlib
-import os
+from __future__ import annotations
+
+import contextlib
+import functools
+import itertools
+import math
 import pathlib
+import sys
 import time
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
 
 import click
 
+from aoc.cache import CACHE_DIR, cached_run_day
+from aoc.runner import DayResult, find_days, run_day
+
+# The modes below pull in heavier modules (concurrent.futures, cProfile,
+# tracemalloc, statistics, ...), so they are only imported when used.
+if TYPE_CHECKING:
+    from aoc.benchmark import Stats
+    from aoc.budget import Overrun
+    from aoc.memory import DayMemory
+    from aoc.profiling import DayProfile, Hotspot
+    from aoc.scaling import Curve
+    from aoc.startup import ImportTime
+    from aoc.variants import Race
+
+
+def parse_sizes(ctx: click.Context, param: click.Parameter, value: str):
+    try:
+        sizes = tuple(sorted({int(size) for size in value.split(",")}))
+    except ValueError:
+        raise click.BadParameter("expected comma-separated sizes, e.g. 100,200,400")
+    if len(sizes) < 2 or sizes[0] < 1:
+        raise click.BadParameter("expected at least two positive sizes")
+    return sizes
+
+
+def parse_days(ctx: click.Context, param: click.Parameter, value: str | None):
+    if value is None:
+        return None
+    try:
+        return ["day" + f"{int(day)}".zfill(2) for day in value.split(",")]
+    except ValueError:
+        raise click.BadParameter("expected comma-separated day numbers, e.g. 6,16")
+
+
+def select_days(days: list[str] | None) -> list[str]:
+    available = find_days()
+    if days is None:
+        return available
+    if unknown := sorted(set(days) - set(available)):
+        raise click.BadParameter(
+            f"no solution for {', '.join(unknown)}", param_hint="--days"
+        )
+    return sorted(set(days))
+
+
+def check_modes(modes: dict[str, bool], run_options: dict[str, bool]) -> None:
+    # Each mode replaces the default run, so modes cannot be combined, nor given the
+    # options that only change the default run.
+    chosen = [name for name, enabled in modes.items() if enabled]
+    if len(chosen) > 1:
+        raise click.UsageError(f"{' and '.join(chosen)} cannot be combined")
+    if chosen and (ignored := [name for name, given in run_options.items() if given]):
+        raise click.UsageError(
+            f"{', '.join(ignored)} cannot be combined with {chosen[0]}"
+        )
+
+
+def solution_modules(days: list[str]) -> list[str]:
+    return [f"solutions.{day}.solution" for day in days]
+
+
+@contextlib.contextmanager
+def mapper(
+    jobs: int, isolated: bool = False, preload: list[str] | None = None
+) -> Iterator[Callable]:
+    if isolated:
+        import concurrent.futures
+        import multiprocessing
+
+        # A fresh interpreter per day, so that peak RSS is that of the day alone.
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=1,
+        ) as executor:
+            yield executor.map
+    elif jobs > 1:
+        import concurrent.futures
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            yield executor.map
+    elif preload is not None:
+        # Days run in this process, so they can borrow one pool for the whole run
+        # instead of starting their own every time.
+        from aoc.pool import PRELOAD, shared_pool
+
+        with shared_pool(PRELOAD + tuple(preload)):
+            yield map
+    else:
+        yield map
+
+
+def report_overrun(overrun: Overrun) -> None:
+    click.echo(
+        f"Went over the {overrun.budget} second {overrun.budget_kind} budget "
+        f"in {overrun.part} after {overrun.seconds:.6f} seconds, killed."
+    )
+    if not overrun.total_samples:
+        click.echo("No stacks sampled, it did not respond in time.\n")
+        return
+    click.echo(
+        f"Most frequent of {overrun.total_samples} stacks sampled every "
+        f"{overrun.interval} seconds:"
+    )
+    for stack, count in overrun.stacks:
+        click.echo(f"  {count} ({count / overrun.total_samples:.0%}):")
+        for frame in stack:
+            click.echo(f"    {frame}")
+    click.echo()
+
+
+def report(
+    results: Iterable[DayResult | Overrun], overruns: list[Overrun] | None = None
+) -> list[float]:
+    times = []
+    for result in results:
+        click.echo(f"Day: {result.day[3:]}")
+        if not isinstance(result, DayResult):
+            report_overrun(result)
+            if overruns is not None:
+                overruns.append(result)
+            continue
+        for name, group in itertools.groupby(result.phases, key=lambda p: p.input):
+            phases = list(group)
+            timings = ", ".join(f"{phase.name} {phase.seconds:.6f}" for phase in phases)
+            click.echo(f"  {name}: {timings} seconds")
+            for phase in phases:
+                if phase.counts:
+                    counts = ", ".join(f"{k} {v:,}" for k, v in phase.counts.items())
+                    click.echo(f"    {phase.name}: {counts}")
+        click.echo(result.output, nl=False)
+        if result.cached:
+            click.echo(f"Cached, took {result.seconds} seconds when last run.\n")
+        else:
+            click.echo(f"Took {result.seconds} seconds.\n")
+            times.append(result.seconds)
+    return times
+
+
+def report_benchmarks(results: Iterable[tuple[str, Stats]]) -> dict[str, Stats]:
+    click.echo(
+        f"{'Day':<5}{'min':>12}{'median':>12}{'p95':>12}{'stddev':>12}{'repeats':>9}"
+    )
+    stats_by_day = {}
+    for day, stats in results:
+        click.echo(
+            f"{day[3:]:<5}{stats.min:>12.6f}{stats.median:>12.6f}{stats.p95:>12.6f}"
+            f"{stats.stddev:>12.6f}{stats.repeats:>9}"
+        )
+        stats_by_day[day] = stats
+    return stats_by_day
+
+
+def run_benchmarks(
+    days: list[str],
+    jobs: int,
+    warmup: int,
+    repeats: int,
+    baseline_path: pathlib.Path,
+    update_baseline: bool,
+    threshold: float,
+) -> None:
+    from aoc.benchmark import (
+        benchmark_day,
+        find_regressions,
+        load_baseline,
+        save_baseline,
+    )
+
+    click.echo(
+        f"Benchmarking with {warmup} warmup run(s) and {repeats} timed run(s) "
+        "per day (seconds) ...\n"
+    )
+    benchmark_day_ = functools.partial(benchmark_day, warmup=warmup, repeats=repeats)
+    with mapper(jobs, preload=solution_modules(days)) as map_:
+        results = report_benchmarks(map_(benchmark_day_, days))
+    baseline = load_baseline(baseline_path)
+    regressions = find_regressions(results, baseline, threshold)
+    if update_baseline or not baseline:
+        save_baseline(baseline_path, results)
+        click.echo(f"\nSaved baseline to {baseline_path}")
+    elif missing := sorted(set(results) - set(baseline)):
+        click.echo(f"\nNo baseline for {', '.join(missing)}, skipped comparison")
+    if regressions:
+        click.echo(f"\nRegressions over {threshold:.0%} against {baseline_path}:")
+        for regression in regressions:
+            click.echo(
+                f"Day {regression.day[3:]}: median {regression.baseline:.6f} -> "
+                f"{regression.current:.6f} seconds ({regression.change:+.1%})"
+            )
+        sys.exit(1)
+
+
+def report_hotspots(title: str, hotspots: list[Hotspot]) -> None:
+    click.echo(f"  {title}:")
+    click.echo(f"  {'ncalls':>10}{'tottime':>12}{'cumtime':>12}  function")
+    for hotspot in hotspots:
+        click.echo(
+            f"  {hotspot.calls:>10}{hotspot.self_seconds:>12.6f}"
+            f"{hotspot.cumulative_seconds:>12.6f}  {hotspot.function}"
+        )
+
+
+def report_profiles(profiles: Iterable[DayProfile], top: int) -> None:
+    for profile in profiles:
+        report([profile.result])
+        for part in profile.parts:
+            click.echo(f"Day: {profile.result.day[3:]} {part.part} ({part.path})")
+            report_hotspots(f"Top {top} by cumulative time", part.by_cumulative)
+            report_hotspots(f"Top {top} by self time", part.by_self)
+            click.echo()
+
+
+def format_bytes(size: int) -> str:
+    if size < 2**20:
+        return f"{size / 2**10:.1f} KiB"
+    return f"{size / 2**20:.1f} MiB"
+
+
+def report_memory(measurements: Iterable[DayMemory]) -> None:
+    for memory in measurements:
+        report([memory.result])
+        day = memory.result.day[3:]
+        click.echo(
+            f"Day: {day} peak RSS {format_bytes(memory.max_rss)}, "
+            f"pool workers {format_bytes(memory.max_rss_workers)}"
+        )
+        for part in memory.parts:
+            click.echo(
+                f"Day: {day} {part.part} peak traced {format_bytes(part.peak)}, "
+                "allocated near the peak:"
+            )
+            click.echo(f"  {'size':>12}{'blocks':>10}  location")
+            for site in part.sites:
+                click.echo(
+                    f"  {format_bytes(site.size):>12}{site.blocks:>10}  {site.location}"
+                )
+        click.echo()
+
+
+def report_import_times(label: str, times: list[ImportTime], top: int) -> None:
+    from aoc.startup import total_seconds
+
+    click.echo(f"{label}: imports took {total_seconds(times):.6f} seconds")
+    for title, key in [("cumulative", "cumulative_seconds"), ("self", "self_seconds")]:
+        click.echo(f"  Top {top} by {title} time:")
+        click.echo(f"  {'self':>10}{'cumulative':>12}  module")
+        for time_ in sorted(times, key=lambda t: getattr(t, key), reverse=True)[:top]:
+            click.echo(
+                f"  {time_.self_seconds:>10.6f}{time_.cumulative_seconds:>12.6f}  "
+                f"{'  ' * time_.depth}{time_.module}"
+            )
+    click.echo()
+
+
+def report_scaling(
+    day: str, curves: list[Curve] | None, max_exponent: float
+) -> list[str]:
+    if curves is None:
+        click.echo(f"Day {day[3:]}: no generate(size, rng), skipped\n")
+        return []
+    click.echo(f"Day {day[3:]}: input sizes {curves[0].input_sizes} bytes")
+    flagged: list[str] = []
+    for curve in curves:
+        timings = " ".join(f"{seconds:.6f}" for seconds in curve.seconds)
+        flag = ""
+        if curve.exponent > max_exponent:
+            flag = "  super-linear"
+            flagged.append(f"Day {day[3:]} {curve.phase}")
+        click.echo(
+            f"  {curve.phase}: {timings} seconds, exponent {curve.exponent:.2f}{flag}"
+        )
+    click.echo()
+    return flagged
+
+
+def report_races(day: str, races: list[Race]) -> bool:
+    agree = True
+    for race in races:
+        click.echo(f"Day {day[3:]} {race.part} on {race.input}:")
+        reference = race.timings[0].stats.median
+        for timing in race.timings:
+            speedup = reference / timing.stats.median
+            click.echo(
+                f"  {timing.name:<12}median {timing.stats.median:.6f} "
+                f"min {timing.stats.min:.6f} seconds ({speedup:.2f}x)  "
+                f"answer {timing.answer}"
+            )
+        if not race.agrees:
+            agree = False
+            click.echo(f"  Answers disagree (expected {race.expected})")
+        click.echo()
+    return agree
+
 
 @click.command()
-def run() -> None:
+@click.option(
+    "--days",
+    callback=parse_days,
+    help="Comma-separated day numbers to run, e.g. 6,16. Defaults to all days.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of days to run in parallel worker processes.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Run every day even if its inputs and code have not changed.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    default=CACHE_DIR,
+    show_default=True,
+    help="Directory for the verified results of unchanged days.",
+)
+@click.option(
+    "--counters",
+    is_flag=True,
+    help="Report the operations counted by each part, e.g. search steps (no cache).",
+)
+@click.option(
+    "--budget",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Seconds a day may take before it is killed and its stacks reported.",
+)
+@click.option(
+    "--part-budget",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Seconds each part of a day may take, as with --budget.",
+)
+@click.option(
+    "--sample-interval",
+    type=click.FloatRange(min=0, min_open=True),
+    default=0.05,
+    show_default=True,
+    help="Seconds between the stack samples taken under a budget.",
+)
+@click.option(
+    "--benchmark",
+    is_flag=True,
+    help="Time repeated runs of each day and compare them against a baseline.",
+)
+@click.option(
+    "--warmup",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Untimed runs per day before benchmarking.",
+)
+@click.option(
+    "--repeats",
+    type=click.IntRange(min=1),
+    default=5,
+    show_default=True,
+    help="Timed runs per day when benchmarking.",
+)
+@click.option(
+    "--baseline",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    default="baseline.json",
+    show_default=True,
+    help="Benchmark baseline to compare against, written if it does not exist.",
+)
+@click.option(
+    "--update-baseline",
+    is_flag=True,
+    help="Overwrite the baseline entries of the benchmarked days.",
+)
+@click.option(
+    "--threshold",
+    type=click.FloatRange(min=0),
+    default=0.1,
+    show_default=True,
+    help="Fractional slowdown of the median that counts as a regression.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Profile the days, including pool workers, and report hot functions.",
+)
+@click.option(
+    "--profile-dir",
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    default="profiles",
+    show_default=True,
+    help="Directory for the per-day and per-part .pstats files.",
+)
+@click.option(
+    "--memory",
+    is_flag=True,
+    help="Run each day in a fresh process and report its peak RSS.",
+)
+@click.option(
+    "--tracemalloc",
+    "trace",
+    is_flag=True,
+    help="With --memory, also report peak traced memory and top allocation sites.",
+)
+@click.option(
+    "--import-time",
+    is_flag=True,
+    help="Report what importing the runner and each day costs in a fresh interpreter.",
+)
+@click.option(
+    "--variants",
+    is_flag=True,
+    help="Cross-check and race the alternative implementations registered by days.",
+)
+@click.option(
+    "--scaling",
+    is_flag=True,
+    help="Time each day on generated inputs of increasing size and fit exponents.",
+)
+@click.option(
+    "--sizes",
+    callback=parse_sizes,
+    default=",".join(str(size) for size in (250, 500, 1000, 2000, 4000)),
+    show_default=True,
+    help="Generator sizes for --scaling, in each day's own unit (lines, cells, ...).",
+)
+@click.option(
+    "--seed",
+    type=int,
+    default=0,
+    show_default=True,
+    help="Random seed for the generated inputs.",
+)
+@click.option(
+    "--max-exponent",
+    type=float,
+    default=1.2,
+    show_default=True,
+    help="Fitted exponents above this are flagged as super-linear.",
+)
+@click.option(
+    "--top",
+    type=click.IntRange(min=1),
+    default=15,
+    show_default=True,
+    help="Number of functions, allocation sites or modules to report.",
+)
+def run(
+    days: list[str] | None,
+    jobs: int,
+    no_cache: bool,
+    cache_dir: pathlib.Path,
+    counters: bool,
+    budget: float | None,
+    part_budget: float | None,
+    sample_interval: float,
+    benchmark: bool,
+    warmup: int,
+    repeats: int,
+    baseline: pathlib.Path,
+    update_baseline: bool,
+    threshold: float,
+    profile: bool,
+    profile_dir: pathlib.Path,
+    memory: bool,
+    trace: bool,
+    import_time: bool,
+    variants: bool,
+    scaling: bool,
+    sizes: tuple[int, ...],
+    seed: int,
+    max_exponent: float,
+    top: int,
+) -> None:
+    check_modes(
+        {
+            "--variants": variants,
+            "--scaling": scaling,
+            "--import-time": import_time,
+            "--profile": profile,
+            "--memory": memory or trace,
+            "--benchmark": benchmark,
+        },
+        {
+            "--counters": counters,
+            "--budget": budget is not None,
+            "--part-budget": part_budget is not None,
+        },
+    )
+    days = select_days(days)
+    if variants:
+        from aoc.variants import race_day
+
+        race_day_ = functools.partial(race_day, warmup=warmup, repeats=repeats)
+        with mapper(jobs) as map_:
+            agree = [
+                report_races(day, races)
+                for day, races in zip(days, map_(race_day_, days))
+                if races
+            ]
+        if not agree:
+            click.echo("No registered variants for these days.")
+        elif not all(agree):
+            sys.exit(1)
+        return
+    if scaling:
+        from aoc.scaling import scaling_curves
+
+        scaling_curves_ = functools.partial(
+            scaling_curves, sizes=sizes, seed=seed, repeats=repeats
+        )
+        with mapper(jobs) as map_:
+            flagged = [
+                hot_spot
+                for day, curves in zip(days, map_(scaling_curves_, days))
+                for hot_spot in report_scaling(day, curves, max_exponent)
+            ]
+        if flagged:
+            click.echo(f"Super-linear above {max_exponent}: {', '.join(flagged)}")
+        return
+    if import_time:
+        from aoc.startup import import_times
+
+        report_import_times("Runner", import_times("merry_christmas"), top)
+        for day in days:
+            times = import_times(f"solutions.{day}.solution")
+            report_import_times(f"Day {day[3:]}", times, top)
+        return
+    if profile:
+        from aoc.profiling import profile_day
+
+        profile_day_ = functools.partial(profile_day, profile_dir=profile_dir, top=top)
+        with mapper(jobs) as map_:
+            report_profiles(map_(profile_day_, days), top)
+        return
+    if memory or trace:
+        from aoc.memory import measure_day
+
+        measure_day_ = functools.partial(measure_day, trace=trace, top=top)
+        with mapper(jobs, isolated=True) as map_:
+            report_memory(map_(measure_day_, days))
+        return
+    if benchmark:
+        run_benchmarks(
+            days, jobs, warmup, repeats, baseline, update_baseline, threshold
+        )
+        return
     click.echo(
         "Running all the solutions on my inputs including examples in some cases ...\n"
     )
-    times = []
-    solutions_dir = pathlib.Path("solutions")
-    for day in sorted(
-        day.name for day in solutions_dir.glob("*") if day.name != ".gitkeep"
-    ):
-        click.echo(f"Day: {day[3:]}")
-        main = getattr(importlib.import_module(f"solutions.{day}.solution"), "main")
-        os.chdir(f"solutions/{day}")
-        start = time.perf_counter()
-        main()
-        seconds = time.perf_counter() - start
-        times.append(seconds)
-        click.echo(f"Took {seconds} seconds.\n")
-        os.chdir("../..")
+    start = time.perf_counter()
+    budgeted = budget is not None or part_budget is not None
+    run_day_: Callable = functools.partial(run_day, count=counters)
+    if budgeted:
+        from aoc.budget import budgeted_run_day
+
+        run_day_ = functools.partial(
+            budgeted_run_day,
+            budget=budget or math.inf,
+            part_budget=part_budget or math.inf,
+            interval=sample_interval,
+            top=top,
+            count=counters,
+        )
+    if not (no_cache or counters):
+        run_day_ = functools.partial(cached_run_day, cache_dir=cache_dir, run=run_day_)
+    if budgeted:
+        from aoc.budget import within_budget
+
+        run_day_ = functools.partial(within_budget, run_day_)
+    overruns: list[Overrun] = []
+    # Budgeted days run in child processes of their own, which cannot borrow it.
+    preload = None if budgeted else solution_modules(days)
+    with mapper(jobs, preload=preload) as map_:
+        times = report(map_(run_day_, days), overruns)
     click.echo(f"Total time: {sum(times)} seconds")
+    if jobs > 1:
+        click.echo(f"Wall time: {time.perf_counter() - start} seconds")
+    if overruns:
+        click.echo(f"Over budget: {', '.join(o.day[3:] for o in overruns)}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -1,32 +1,81 @@
 import collections
 import pathlib
+import random
 
+import numpy as np
 
-def read_lists(path: pathlib.Path) -> tuple[list[int], list[int]]:
-    left: list[int] = []
-    right: list[int] = []
-    for line in path.read_text().rstrip().splitlines():
-        a, b = line.split()
-        left.append(int(a))
-        right.append(int(b))
+from aoc.ints import read_ints
+
+type Lists = tuple[np.ndarray, np.ndarray]
+
+ANSWERS = {"input.txt": (1197984, 23387399)}
+
+
+def read_lists(path: pathlib.Path) -> Lists:
+    left, right = read_ints(path).values.reshape(-1, 2).T
     return left, right
 
 
-def part1(left: list[int], right: list[int]) -> int:
-    left.sort()
-    right.sort()
+parse = read_lists
+
+
+def fits_int64(bound: int) -> bool:
+    return bound < 2**63
+
+
+def magnitude(values: np.ndarray) -> int:
+    # The largest absolute value, as a Python int since np.abs wraps on INT64_MIN.
+    return max(int(values.max(initial=0)), -int(values.min(initial=0)))
+
+
+def part1(lists: Lists) -> int:
+    left, right = lists
+    # Bounds the differences before taking them, as well as their sum.
+    if not fits_int64((magnitude(left) + magnitude(right)) * len(left)):
+        return part1_python(lists)
+    return int(np.abs(np.sort(left) - np.sort(right)).sum())
+
+
+def part2(lists: Lists) -> int:
+    left, right = lists
+    values, counts = np.unique(right, return_counts=True)
+    if not len(values):
+        return 0
+    indices = np.minimum(np.searchsorted(values, left), len(values) - 1)
+    counts = np.where(values[indices] == left, counts[indices], 0)
+    if not fits_int64(magnitude(left) * int(counts.sum())):
+        return part2_python(lists)
+    return int(np.dot(left, counts))
+
+
+def part1_python(lists: Lists) -> int:
+    left, right = sorted(lists[0].tolist()), sorted(lists[1].tolist())
     return sum(abs(a - b) for a, b in zip(left, right))
 
 
-def part2(left, right) -> int:
+def part2_python(lists: Lists) -> int:
+    left, right = lists[0].tolist(), lists[1].tolist()
     counter = collections.Counter(right)
     return sum(a * counter.get(a, 0) for a in left)
 
 
-def main() -> None:
-    left, right = read_lists(pathlib.Path("input.txt"))
-    assert part1(left, right) == 1197984
-    assert part2(left, right) == 23387399
+VARIANTS = {"part1": {"python": part1_python}, "part2": {"python": part2_python}}
+
+
+def generate(size: int, rng: random.Random) -> str:
+    # size lines, with the right column drawn from a range that overlaps the left
+    # one so that part 2 finds repeats.
+    return "\n".join(
+        f"{rng.randint(10000, 10000 + size)}   {rng.randint(10000, 10000 + size)}"
+        for _ in range(size)
+    )
+
+
+def main(directory: pathlib.Path = pathlib.Path(__file__).parent) -> None:
+    for name, (answer1, answer2) in ANSWERS.items():
+        lists = parse(directory / name)
+        assert part1(lists) == answer1
+        assert part2(lists) == answer2
     print("All tests passed.")
 
 
@@ -0,0 +1,145 @@
+import heapq
+import itertools
+import pathlib
+import tempfile
+from typing import Iterator
+
+import numpy as np
+
+from aoc.ints import parse_ints
+from solutions.day01.solution import ANSWERS
+
+# Bytes of input parsed at a time, whatever the size of the input. Parsing a chunk
+# takes a few tens of times its size in memory.
+CHUNK_BYTES = 2**22
+
+# Runs merged at once, so that what is buffered from them is bounded by the chunk size.
+FAN_IN = 16
+
+
+def read_chunks(path: pathlib.Path, chunk_bytes: int) -> Iterator[np.ndarray]:
+    # Rows of (left, right) pairs, a chunk of whole lines at a time.
+    with path.open("rb") as file:
+        rest = b""
+        while block := file.read(chunk_bytes):
+            block = rest + block
+            end = block.rfind(b"\n") + 1
+            rest = block[end:]
+            if end:
+                yield parse_ints(block[:end]).values.reshape(-1, 2)
+        if rest.strip():
+            yield parse_ints(rest).values.reshape(-1, 2)
+
+
+def spill_runs(
+    path: pathlib.Path, chunk_bytes: int, directory: pathlib.Path
+) -> tuple[list[pathlib.Path], list[pathlib.Path]]:
+    # Sorts each chunk of both columns and writes them out as runs of raw int64s.
+    runs = ([], [])
+    for i, rows in enumerate(read_chunks(path, chunk_bytes)):
+        for column, side in enumerate(("left", "right")):
+            run = directory / f"{side}-{i}.bin"
+            np.sort(rows[:, column]).tofile(run)
+            runs[column].append(run)
+    return runs
+
+
+def read_run(run: pathlib.Path, block: int) -> Iterator[int]:
+    offset = 0
+    while len(values := np.fromfile(run, dtype=np.int64, count=block, offset=offset)):
+        yield from values.tolist()
+        offset += values.nbytes
+
+
+def merged(runs: list[pathlib.Path], block: int) -> Iterator[np.ndarray]:
+    # The runs merged into one sorted stream, a block at a time.
+    values = heapq.merge(*(read_run(run, block) for run in runs))
+    while len(merged_block := np.fromiter(itertools.islice(values, block), np.int64)):
+        yield merged_block
+
+
+def merge_runs(
+    runs: list[pathlib.Path], block: int, directory: pathlib.Path
+) -> list[pathlib.Path]:
+    # Merges the runs FAN_IN at a time into longer ones, in as many passes as it takes
+    # to leave at most FAN_IN of them.
+    while len(runs) > FAN_IN:
+        longer: list[pathlib.Path] = []
+        for i in range(0, len(runs), FAN_IN):
+            with tempfile.NamedTemporaryFile(
+                dir=directory, suffix=".bin", delete=False
+            ) as file:
+                for values in merged(runs[i : i + FAN_IN], block):
+                    values.tofile(file)
+            for run in runs[i : i + FAN_IN]:
+                run.unlink()
+            longer.append(pathlib.Path(file.name))
+        runs = longer
+    return runs
+
+
+def sorted_columns(
+    path: pathlib.Path, chunk_bytes: int, directory: pathlib.Path
+) -> tuple[Iterator[np.ndarray], Iterator[np.ndarray]]:
+    # Both columns in order, a block at a time, from runs in directory. A chunk's
+    # worth of int64s is split between the runs being merged for both columns.
+    left_runs, right_runs = spill_runs(path, chunk_bytes, directory)
+    block = max(1024, chunk_bytes // 8 // (2 * FAN_IN))
+    return (
+        merged(merge_runs(left_runs, block, directory), block),
+        merged(merge_runs(right_runs, block, directory), block),
+    )
+
+
+def part1(path: pathlib.Path, chunk_bytes: int = CHUNK_BYTES) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        lefts, rights = sorted_columns(path, chunk_bytes, pathlib.Path(directory))
+        # Both columns have as many values, so their blocks line up.
+        return sum(
+            int(np.abs(left - right).sum()) for left, right in zip(lefts, rights)
+        )
+
+
+def counted(blocks: Iterator[np.ndarray]) -> Iterator[tuple[int, int]]:
+    # Each value of a sorted stream with the number of times it occurs, which may
+    # span blocks.
+    value, count = None, 0
+    for block in blocks:
+        values, counts = np.unique(block, return_counts=True)
+        for v, c in zip(values.tolist(), counts.tolist()):
+            if v == value:
+                count += c
+                continue
+            if value is not None:
+                yield value, count
+            value, count = v, c
+    if value is not None:
+        yield value, count
+
+
+def part2(path: pathlib.Path, chunk_bytes: int = CHUNK_BYTES) -> int:
+    # The similarity score is the sum of v * (times v is on the left) * (times v is on
+    # the right), so both sorted columns are joined on their values.
+    with tempfile.TemporaryDirectory() as directory:
+        lefts, rights = sorted_columns(path, chunk_bytes, pathlib.Path(directory))
+        right = counted(rights)
+        total = 0
+        right_value, right_count = next(right, (None, 0))
+        for value, count in counted(lefts):
+            while right_value is not None and right_value < value:
+                right_value, right_count = next(right, (None, 0))
+            if right_value == value:
+                total += value * count * right_count
+        return total
+
+
+def main(directory: pathlib.Path = pathlib.Path(__file__).parent) -> None:
+    for name, (answer1, answer2) in ANSWERS.items():
+        # Small chunks, so that there are several runs to merge.
+        assert part1(directory / name, chunk_bytes=4096) == answer1
+        assert part2(directory / name, chunk_bytes=4096) == answer2
+    print("All tests passed.")
+
+
+if __name__ == "__main__":
+    main()
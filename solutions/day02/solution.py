@@ -1,12 +1,20 @@
 import copy
 import pathlib
+import random
+from typing import Iterator
 
+import numpy as np
 
-def get_reports(path: pathlib.Path) -> list[list[int]]:
-    return [
-        [int(level) for level in report.split()]
-        for report in path.read_text().rstrip().splitlines()
-    ]
+from aoc.ints import Ints, read_ints
+
+ANSWERS = {"input.txt": (572, 612)}
+
+
+def get_reports(path: pathlib.Path) -> Ints:
+    return read_ints(path)
+
+
+parse = get_reports
 
 
 def is_safe(report: list[int]) -> bool:
@@ -22,7 +30,35 @@ def is_safe(report: list[int]) -> bool:
     return True
 
 
+def is_safe_skipping(report: list[int], direction: int, skip: int) -> bool:
+    # Whether the report without its level at skip steps by 1 to 3 in direction.
+    prev: int | None = None
+    for i, level in enumerate(report):
+        if i == skip:
+            continue
+        if prev is not None and not 0 < (level - prev) * direction < 4:
+            return False
+        prev = level
+    return True
+
+
 def is_safe_with_removal(report: list[int]) -> bool:
+    # Any removal that makes the report safe must drop one of the two levels of its
+    # first unsafe step, so only those are tried, in either direction.
+    for direction in (1, -1):
+        for i in range(1, len(report)):
+            if not 0 < (report[i] - report[i - 1]) * direction < 4:
+                if is_safe_skipping(report, direction, i - 1) or is_safe_skipping(
+                    report, direction, i
+                ):
+                    return True
+                break
+        else:
+            return True
+    return False
+
+
+def is_safe_with_removal_quadratic(report: list[int]) -> bool:
     safe = is_safe(report)
     if safe:
         return True
@@ -35,18 +71,77 @@ def is_safe_with_removal(report: list[int]) -> bool:
     return False
 
 
-def part1(reports: list[list[int]]) -> int:
-    return sum(is_safe(report) for report in reports)
+def by_length(reports: Ints) -> Iterator[np.ndarray]:
+    # Reports of each length as the rows of one array.
+    lengths = np.diff(reports.offsets)
+    for length in np.unique(lengths).tolist():
+        starts = reports.offsets[:-1][lengths == length]
+        yield reports.values[starts[:, None] + np.arange(length)]
+
+
+def are_safe(levels: np.ndarray) -> np.ndarray:
+    diffs = np.diff(levels, axis=1)
+    increasing = ((diffs >= 1) & (diffs <= 3)).all(axis=1)
+    decreasing = ((diffs >= -3) & (diffs <= -1)).all(axis=1)
+    return increasing | decreasing
+
+
+def are_safe_with_removal(levels: np.ndarray) -> np.ndarray:
+    safe = are_safe(levels)
+    length = levels.shape[1]
+    # Row k of kept holds the columns other than k.
+    kept = np.arange(1, length) - np.tri(length, length - 1, -1, dtype=int)
+    for columns in kept:
+        safe |= are_safe(levels[:, columns])
+    return safe
+
+
+def part1(reports: Ints) -> int:
+    return sum(int(are_safe(levels).sum()) for levels in by_length(reports))
+
+
+def part2(reports: Ints) -> int:
+    return sum(
+        int(are_safe_with_removal(levels).sum()) for levels in by_length(reports)
+    )
+
+
+def part1_python(reports: Ints) -> int:
+    return sum(is_safe(report) for report in reports.lines())
+
+
+def part2_python(reports: Ints) -> int:
+    return sum(is_safe_with_removal(report) for report in reports.lines())
+
+
+def part2_quadratic(reports: Ints) -> int:
+    return sum(is_safe_with_removal_quadratic(report) for report in reports.lines())
+
+
+VARIANTS = {
+    "part1": {"python": part1_python},
+    "part2": {"python": part2_python, "quadratic": part2_quadratic},
+}
 
 
-def part2(reports: list[list[int]]) -> int:
-    return sum(is_safe_with_removal(report) for report in reports)
+def generate(size: int, rng: random.Random) -> str:
+    # size reports of 5 to 8 levels, mostly monotonic with the odd bad step.
+    reports: list[str] = []
+    for _ in range(size):
+        direction = rng.choice((-1, 1))
+        levels = [rng.randint(10, 90)]
+        for _ in range(rng.randint(4, 7)):
+            step = rng.randint(1, 3) if rng.random() < 0.9 else rng.randint(-2, 5)
+            levels.append(levels[-1] + direction * step)
+        reports.append(" ".join(str(level) for level in levels))
+    return "\n".join(reports)
 
 
-def main() -> None:
-    reports = get_reports(pathlib.Path("input.txt"))
-    assert part1(reports) == 572
-    assert part2(reports) == 612
+def main(directory: pathlib.Path = pathlib.Path(__file__).parent) -> None:
+    for name, (answer1, answer2) in ANSWERS.items():
+        reports = parse(directory / name)
+        assert part1(reports) == answer1
+        assert part2(reports) == answer2
     print("All tests passed.")
 
 
@@ -0,0 +1,94 @@
+import mmap
+import os
+import pathlib
+import re
+from itertools import repeat
+from typing import Iterator, NamedTuple
+
+from aoc.pool import pool
+from solutions.day03.solution import ANSWERS
+
+# Bytes scanned by each task.
+CHUNK_BYTES = 2**24
+
+PATTERN = re.compile(rb"mul\((\d+),(\d+)\)|(do\(\))|(don't\(\))")
+
+
+class Partial(NamedTuple):
+    # The sums of a chunk's multiplications: all of them, those enabled if the chunk
+    # starts enabled and those enabled if it starts disabled, with whether the last
+    # do() or don't() of the chunk enables them (None if it has neither).
+    total: int
+    enabled: int
+    disabled: int
+    last: bool | None
+
+
+def matches(data: bytes | mmap.mmap, start: int, end: int) -> Iterator[re.Match]:
+    # The instructions that start in the chunk. No instruction can start inside
+    # another, so a file cut anywhere is scanned exactly as if it were whole.
+    last = start
+    for match in PATTERN.finditer(data, start, end):
+        last = match.end()
+        yield match
+    # Instructions only have an m or a d at their start, so one that runs past the
+    # end of the chunk starts at the last of them. Matching there reads no further
+    # than that instruction.
+    crossing = max(data.rfind(b"m", last, end), data.rfind(b"d", last, end))
+    if crossing != -1 and (match := PATTERN.match(data, crossing)):
+        yield match
+
+
+def scan(data: bytes | mmap.mmap, start: int, end: int) -> Partial:
+    total = before = after = 0
+    last = None
+    for match in matches(data, start, end):
+        a, b, enable, disable = match.groups()
+        if enable is not None:
+            last = True
+        elif disable is not None:
+            last = False
+        else:
+            product = int(a) * int(b)
+            total += product
+            if last is None:
+                before += product
+            elif last:
+                after += product
+    return Partial(total, before + after, after, last)
+
+
+def scan_chunk(path: pathlib.Path, start: int, end: int) -> Partial:
+    with path.open("rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return scan(data, start, end)
+
+
+def stitch(partials: list[Partial]) -> tuple[int, int]:
+    answer1 = answer2 = 0
+    enabled = True
+    for partial in partials:
+        answer1 += partial.total
+        answer2 += partial.enabled if enabled else partial.disabled
+        if partial.last is not None:
+            enabled = partial.last
+    return answer1, answer2
+
+
+def scan_file(path: pathlib.Path, chunk_bytes: int = CHUNK_BYTES) -> tuple[int, int]:
+    size = os.path.getsize(path)
+    starts = range(0, size, chunk_bytes)
+    ends = [min(start + chunk_bytes, size) for start in starts]
+    with pool() as executor:
+        return stitch(list(executor.map(scan_chunk, repeat(path), starts, ends)))
+
+
+def main(directory: pathlib.Path = pathlib.Path(__file__).parent) -> None:
+    for name, answers in ANSWERS.items():
+        # Small chunks, so that instructions straddle their edges.
+        assert scan_file(directory / name, chunk_bytes=97) == answers
+    print("All tests passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
 import pathlib
+import random
 import re
 
+ANSWERS = {"input.txt": (178886550, 87163705)}
+
 
 def read_memory(path: pathlib.Path) -> str:
     return path.read_text().rstrip()
 
 
+parse = read_memory
+
+
 def part1(memory: str) -> int:
     pattern = re.compile(r"mul\((?P<a>\d+),(?P<b>\d+)\)")
     answer = 0
@@ -32,10 +38,34 @@ def part2(memory: str) -> int:
     return answer
 
 
-def main() -> None:
-    memory = read_memory(pathlib.Path("input.txt"))
-    assert part1(memory) == 178886550
-    assert part2(memory) == 87163705
+def generate(size: int, rng: random.Random) -> str:
+    # size tokens of valid instructions and the usual corruption around them.
+    tokens: list[str] = []
+    for _ in range(size):
+        a, b = rng.randint(1, 999), rng.randint(1, 999)
+        tokens.append(
+            rng.choice(
+                [
+                    f"mul({a},{b})",
+                    f"mul({a},{b})",
+                    "do()",
+                    "don't()",
+                    f"mul({a}, {b})",
+                    f"mul({a}*",
+                    f"what({a},{b})",
+                    "%&[!",
+                    "who()<",
+                ]
+            )
+        )
+    return "".join(tokens)
+
+
+def main(directory: pathlib.Path = pathlib.Path(__file__).parent) -> None:
+    for name, (answer1, answer2) in ANSWERS.items():
+        memory = parse(directory / name)
+        assert part1(memory) == answer1
+        assert part2(memory) == answer2
     print("All tests passed.")
 
 
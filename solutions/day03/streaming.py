@@ -0,0 +1,60 @@
+import pathlib
+import re
+from typing import BinaryIO, Iterator
+
+from solutions.day03.chunked import PATTERN
+from solutions.day03.solution import ANSWERS
+
+# An unfinished instruction at the end of what has been fed so far.
+PARTIAL = re.compile(
+    rb"(?:m(?:u(?:l(?:\((?:\d+(?:,\d*)?)?)?)?)?|d(?:o(?:\(|n(?:'(?:t\(?)?)?)?)?)\Z"
+)
+
+
+class Scanner:
+    # Scans memory as it arrives, keeping only the bytes of an instruction that may be
+    # finished by the next chunk.
+    def __init__(self) -> None:
+        self.part1 = 0
+        self.part2 = 0
+        self.enabled = True
+        self.rest = b""
+
+    def feed(self, chunk: bytes) -> None:
+        data = self.rest + chunk
+        end = 0
+        for match in PATTERN.finditer(data):
+            a, b, enable, disable = match.groups()
+            if enable is not None:
+                self.enabled = True
+            elif disable is not None:
+                self.enabled = False
+            else:
+                product = int(a) * int(b)
+                self.part1 += product
+                if self.enabled:
+                    self.part2 += product
+            end = match.end()
+        partial = PARTIAL.search(data, end)
+        self.rest = data[partial.start() :] if partial else b""
+
+
+def totals(file: BinaryIO, chunk_bytes: int = 2**16) -> Iterator[tuple[int, int]]:
+    # The answers so far after each chunk read, e.g. from a pipe or a growing log.
+    scanner = Scanner()
+    while chunk := file.read(chunk_bytes):
+        scanner.feed(chunk)
+        yield scanner.part1, scanner.part2
+
+
+def main(directory: pathlib.Path = pathlib.Path(__file__).parent) -> None:
+    for name, answers in ANSWERS.items():
+        with (directory / name).open("rb") as file:
+            # Small chunks, so that instructions straddle them.
+            *_, last = totals(file, chunk_bytes=5)
+        assert last == answers
+    print("All tests passed.")
+
+
+if __name__ == "__main__":
+    main()
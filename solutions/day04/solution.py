@@ -1,23 +1,73 @@
+import math
 import pathlib
+import random
 import re
 
 import numpy as np
 
-XMAS = re.compile(r"(?=XMAS)|(?=SAMX)")
+from aoc.grid import Grid
+from aoc.wordsearch import find_words
 
-MAS = np.array(["M", "A", "S"])
-SAM = np.array(["S", "A", "M"])
+XMAS = re.compile(rb"(?=XMAS)|(?=SAMX)")
+
+MAS = np.frombuffer(b"MAS", dtype=np.uint8)
+SAM = np.frombuffer(b"SAM", dtype=np.uint8)
+
+# Row and column steps to the 8 neighbours.
+DIRECTIONS = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
+
+ANSWERS = {"example.txt": (18, 9), "input.txt": (2524, 1873)}
 
 
 def read_matrix(path: pathlib.Path) -> np.ndarray:
-    return np.array([list(row) for row in path.read_text().rstrip().splitlines()])
+    return Grid.from_file(path).array()
 
 
-def num_xmas_for_vector(vector: np.ndarray) -> int:
-    return len(re.findall(XMAS, "".join(vector)))
+parse = read_matrix
+
+
+def count_word(matrix: np.ndarray, word: bytes, dr: int, dc: int) -> int:
+    # Each letter of the word is compared with the grid shifted by its offset from the
+    # first letter, over every start from which the whole word fits.
+    n, m = matrix.shape
+    span = len(word) - 1
+    rows, cols = n - span * abs(dr), m - span * abs(dc)
+    if rows <= 0 or cols <= 0:
+        return 0
+    row, col = span * (dr < 0), span * (dc < 0)
+    found = np.ones((rows, cols), dtype=bool)
+    for k, letter in enumerate(word):
+        r, c = row + k * dr, col + k * dc
+        found &= matrix[r : r + rows, c : c + cols] == letter
+    return int(found.sum())
 
 
 def part1(matrix: np.ndarray) -> int:
+    return sum(count_word(matrix, b"XMAS", dr, dc) for dr, dc in DIRECTIONS)
+
+
+def part2(matrix: np.ndarray) -> int:
+    n, m = matrix.shape
+    if n < 3 or m < 3:
+        return 0
+
+    def around(dr: int, dc: int) -> np.ndarray:
+        # The letters next to every cell that is not on the edge.
+        return matrix[1 + dr : n - 1 + dr, 1 + dc : m - 1 + dc]
+
+    def is_mas(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return ((a == MAS[0]) & (b == MAS[2])) | ((a == SAM[0]) & (b == SAM[2]))
+
+    found = (around(0, 0) == MAS[1]) & is_mas(around(-1, -1), around(1, 1))
+    found &= is_mas(around(-1, 1), around(1, -1))
+    return int(found.sum())
+
+
+def num_xmas_for_vector(vector: np.ndarray) -> int:
+    return len(re.findall(XMAS, vector.tobytes()))
+
+
+def part1_regex(matrix: np.ndarray) -> int:
     n, m = matrix.shape
     if n != m:
         raise ValueError("non-square matrix")
@@ -45,7 +95,7 @@ def is_xmas(submatrix: np.ndarray) -> bool:
     )
 
 
-def part2(matrix: np.ndarray) -> int:
+def part2_windows(matrix: np.ndarray) -> int:
     n, m = matrix.shape
     if n != m:
         raise ValueError("non-square matrix")
@@ -56,13 +106,27 @@ def part2(matrix: np.ndarray) -> int:
     )
 
 
-def main() -> None:
-    example_matrix = read_matrix(pathlib.Path("example.txt"))
-    matrix = read_matrix(pathlib.Path("input.txt"))
-    assert part1(example_matrix) == 18
-    assert part1(matrix) == 2524
-    assert part2(example_matrix) == 9
-    assert part2(matrix) == 1873
+def part1_automaton(matrix: np.ndarray) -> int:
+    return len(find_words(matrix, [b"XMAS"])[b"XMAS"])
+
+
+VARIANTS = {
+    "part1": {"regex": part1_regex, "automaton": part1_automaton},
+    "part2": {"windows": part2_windows},
+}
+
+
+def generate(size: int, rng: random.Random) -> str:
+    # A square grid of about size letters.
+    n = max(4, math.isqrt(size))
+    return "\n".join("".join(rng.choices("XMAS", k=n)) for _ in range(n))
+
+
+def main(directory: pathlib.Path = pathlib.Path(__file__).parent) -> None:
+    for name, (answer1, answer2) in ANSWERS.items():
+        matrix = parse(directory / name)
+        assert part1(matrix) == answer1
+        assert part2(matrix) == answer2
     print("All tests passed.")
 
 
@@ -1,35 +1,79 @@
 from __future__ import annotations
 
 import pathlib
-from collections import defaultdict
+import random
+from functools import cmp_to_key
 
+ANSWERS = {"example.txt": (143, 123), "input.txt": (7024, 4151)}
 
-class PageNumber:
-    rules: dict[str, list[str]]
 
-    def __init__(self, value: str) -> None:
-        self.value = value
+class Rules:
+    # Page numbers interned as small ints, with before[x][y] set if a rule puts page x
+    # before page y, so that comparing two pages is two lookups.
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+        self.values: list[int] = []
+        self.before: list[bytearray] = []
 
-    def __lt__(self, other: PageNumber) -> bool:
-        return other.value in self.rules[self.value]
+    def intern(self, value: str) -> int:
+        if (page := self.ids.get(value)) is None:
+            page = self.ids[value] = len(self.values)
+            self.values.append(int(value))
+            for row in self.before:
+                row.append(0)
+            self.before.append(bytearray(len(self.values)))
+        return page
+
+    def add(self, x: str, y: str) -> None:
+        self.before[self.intern(x)][self.intern(y)] = 1
+
+    def compare(self, x: int, y: int) -> int:
+        return self.before[y][x] - self.before[x][y]
 
 
 class Update:
-    def __init__(self, page_numbers: list[PageNumber]):
-        self.page_numbers = page_numbers
+    def __init__(self, pages: list[int], rules: Rules):
+        self.pages = pages
+        self.rules = rules
 
     def is_ordered(self) -> bool:
-        return all(x < y for x, y in zip(self.page_numbers, self.page_numbers[1:]))
+        before = self.rules.before
+        return all(before[x][y] for x, y in zip(self.pages, self.pages[1:]))
 
     def sorted(self) -> Update:
-        return Update(sorted(self.page_numbers))
+        pages = sorted(self.pages, key=cmp_to_key(self.rules.compare))
+        return Update(pages, self.rules)
 
     def midpoint(self) -> int:
-        return int(self.page_numbers[len(self.page_numbers) // 2].value)
-
-
-def read_updates_and_set_rules(path: pathlib.Path) -> list[Update]:
-    rules: list[tuple[str, str]] = []
+        return self.rules.values[self.pages[len(self.pages) // 2]]
+
+    def ordered_midpoint(self) -> int:
+        # The middle page once ordered, by quickselect: the pages a pivot must come
+        # before tell its place, and only the side with the middle is searched on.
+        # Random pivots keep the expected work linear whatever the order of the pages.
+        # Falls back to sorting if the rules leave a pivot unordered with some pages.
+        before = self.rules.before
+        pages = self.pages
+        middle = len(pages) // 2
+        while len(pages) > 1:
+            pivot = random.choice(pages)
+            row = before[pivot]
+            after = [x for x in pages if row[x]]
+            ahead = [x for x in pages if before[x][pivot]]
+            if len(after) + len(ahead) != len(pages) - 1:
+                return self.sorted().midpoint()
+            if middle == len(ahead):
+                return self.rules.values[pivot]
+            if middle < len(ahead):
+                pages = ahead
+            else:
+                pages = after
+                middle -= len(ahead) + 1
+        return self.rules.values[pages[0]]
+
+
+def read_updates(path: pathlib.Path) -> list[Update]:
+    rules = Rules()
     updates: list[Update] = []
     populate_rules = True
     for line in path.read_text().rstrip().splitlines():
@@ -37,33 +81,55 @@ def read_updates_and_set_rules(path: pathlib.Path) -> list[Update]:
             populate_rules = False
         elif populate_rules:
             x, y = line.split("|")
-            rules.append((x, y))
+            rules.add(x, y)
         else:
-            updates.append(Update([PageNumber(value) for value in line.split(",")]))
-    rules_dict = defaultdict[str, list[str]](list)
-    for x, y in rules:
-        rules_dict[x].append(y)
-    PageNumber.rules = rules_dict
+            pages = [rules.intern(value) for value in line.split(",")]
+            updates.append(Update(pages, rules))
     return updates
 
 
+parse = read_updates
+
+
 def part1(updates: list[Update]) -> int:
     return sum(update.midpoint() for update in updates if update.is_ordered())
 
 
 def part2(updates: list[Update]) -> int:
+    return sum(
+        update.ordered_midpoint() for update in updates if not update.is_ordered()
+    )
+
+
+def part2_sort(updates: list[Update]) -> int:
     return sum(
         update.sorted().midpoint() for update in updates if not update.is_ordered()
     )
 
 
-def main() -> None:
-    updates = read_updates_and_set_rules(pathlib.Path("example.txt"))
-    assert part1(updates) == 143
-    assert part2(updates) == 123
-    updates = read_updates_and_set_rules(pathlib.Path("input.txt"))
-    assert part1(updates) == 7024
-    assert part2(updates) == 4151
+VARIANTS = {"part2": {"sort": part2_sort}}
+
+
+def generate(size: int, rng: random.Random) -> str:
+    # A total order over 49 pages given as one rule per pair, like the real input,
+    # and size updates of which about half are in order.
+    order = rng.sample(range(10, 100), k=49)
+    rules = [f"{x}|{y}" for i, x in enumerate(order) for y in order[i + 1 :]]
+    rng.shuffle(rules)
+    updates: list[str] = []
+    for _ in range(size):
+        pages = rng.sample(order, k=rng.randrange(5, 24, 2))
+        if rng.random() < 0.5:
+            pages.sort(key=order.index)
+        updates.append(",".join(str(page) for page in pages))
+    return "\n".join(rules) + "\n\n" + "\n".join(updates)
+
+
+def main(directory: pathlib.Path = pathlib.Path(__file__).parent) -> None:
+    for name, (answer1, answer2) in ANSWERS.items():
+        updates = parse(directory / name)
+        assert part1(updates) == answer1
+        assert part2(updates) == answer2
     print("All tests passed.")
 
 
@@ -1,12 +1,15 @@
-import concurrent.futures
-import copy
+import math
 import pathlib
+import random
 from functools import partial
 
-import tqdm
+from aoc import metrics
+from aoc.grid import NORTH, OUTSIDE, Grid, pack
 
-type Grid = list[list[str]]
-type Point = tuple[int, int]
+ANSWERS = {"example.txt": (41, 6), "input.txt": (5086, 1770)}
+
+FREE = b".^"
+OBSTRUCTION = ord("O")
 
 
 class LoopFoundError(Exception):
@@ -14,64 +17,53 @@ class LoopFoundError(Exception):
 
 
 def read_grid(path: pathlib.Path) -> Grid:
-    return [list(row) for row in path.read_text().rstrip().splitlines()]
+    return Grid.from_file(path, border=1)
 
 
-def add(a: Point, b: Point) -> Point:
-    return (a[0] + b[0], a[1] + b[1])
+parse = read_grid
 
 
-def start(grid: Grid) -> Point:
-    for i in range(len(grid)):
-        for j in range(len(grid[0])):
-            if grid[i][j] == "^":
-                return (i, j)
-    raise RuntimeError("no starting position")
+def start(grid: Grid) -> int:
+    return grid.locate("^")
 
 
-def new_grid(grid: Grid, obstruction: Point) -> Grid:
-    grid = copy.deepcopy(grid)
-    grid[obstruction[0]][obstruction[1]] = "O"
+def new_grid(grid: Grid, obstruction: int) -> Grid:
+    grid = grid.copy()
+    grid.cells[obstruction] = OBSTRUCTION
     return grid
 
 
-def walk(grid: Grid, start: Point) -> set[Point]:
+def walk(grid: Grid, start: int) -> set[int]:
+    cells, offsets = grid.cells, grid.offsets
     position = start
-    momentum: Point = (-1, 0)
-    visited = set[Point]([position])
-    visited_with_momentum = set[tuple[Point, Point]]([(position, momentum)])
+    direction = NORTH
+    visited = set[int]([position])
+    visited_with_direction = set[int]([pack(position, direction)])
+    steps = 0
 
     while True:
-        next_position = add(position, momentum)
-        if not (
-            (0 <= next_position[0] < len(grid))
-            and (0 <= next_position[1] < len(grid[0]))
-        ):
+        steps += 1
+        next_position = position + offsets[direction]
+        cell = cells[next_position]
+        if cell == OUTSIDE:
+            metrics.add("walk steps", steps)
             return visited
-        elif grid[next_position[0]][next_position[1]] in (".", "^"):
+        elif cell in FREE:
             position = next_position
             visited.add(position)
-            if (position, momentum) in visited_with_momentum:
+            if (state := position << 2 | direction) in visited_with_direction:
+                metrics.add("walk steps", steps)
                 raise LoopFoundError
-            visited_with_momentum.add((position, momentum))
+            visited_with_direction.add(state)
         else:
-            match momentum:
-                case (-1, 0):
-                    momentum = (0, 1)
-                case (0, 1):
-                    momentum = (1, 0)
-                case (1, 0):
-                    momentum = (0, -1)
-                case _:
-                    momentum = (-1, 0)
-
-
-def part1(path: pathlib.Path) -> int:
-    grid = read_grid(path)
+            direction = (direction + 1) % 4
+
+
+def part1(grid: Grid) -> int:
     return len(walk(grid, start(grid)))
 
 
-def worker(start: Point, grid: Grid, obstruction: Point) -> int:
+def worker(start: int, grid: Grid, obstruction: int) -> int:
     try:
         walk(new_grid(grid, obstruction), start)
         return 0
@@ -79,33 +71,41 @@ def worker(start: Point, grid: Grid, obstruction: Point) -> int:
         return 1
 
 
-def part2(path: pathlib.Path, disable_progress: bool = False) -> int:
+def part2(grid: Grid, disable_progress: bool = False) -> int:
     # NOTE this can be solved more efficiently by jumping between obstructions, but
     # this brute-force method takes only ~ 15 seconds on my 20 core machine.
 
-    grid = read_grid(path)
+    # Imported here so that part 1 alone does not pay for them.
+    import tqdm
+
+    from aoc.pool import pool
+
     start_ = start(grid)
-    obstructions: list[Point] = []
-    for i in range(len(grid)):
-        for j in range(len(grid[0])):
-            if grid[i][j] in (".", "^"):
-                obstructions.append((i, j))
-    worker_ = partial(worker, start_, grid)
-    with concurrent.futures.ProcessPoolExecutor() as executor:
+    obstructions = [index for index, cell in enumerate(grid.cells) if cell in FREE]
+    worker_ = metrics.tracked(partial(worker, start_, grid))
+    with pool() as executor:
         return sum(
             tqdm.tqdm(
-                executor.map(worker_, obstructions),
+                metrics.gather(executor.map(worker_, obstructions)),
                 total=len(obstructions),
                 disable=disable_progress,
             )
         )
 
 
-def main() -> None:
-    assert part1(pathlib.Path("example.txt")) == 41
-    assert part1(pathlib.Path("input.txt")) == 5086
-    assert part2(pathlib.Path("example.txt"), disable_progress=True) == 6
-    assert part2(pathlib.Path("input.txt")) == 1770
+def generate(size: int, rng: random.Random) -> str:
+    # A square grid of about size cells, a tenth of them obstructed.
+    n = max(5, math.isqrt(size))
+    grid = [["#" if rng.random() < 0.1 else "." for _ in range(n)] for _ in range(n)]
+    grid[rng.randrange(n)][rng.randrange(n)] = "^"
+    return "\n".join("".join(row) for row in grid)
+
+
+def main(directory: pathlib.Path = pathlib.Path(__file__).parent) -> None:
+    for name, (answer1, answer2) in ANSWERS.items():
+        grid = parse(directory / name)
+        assert part1(grid) == answer1
+        assert part2(grid, disable_progress=name == "example.txt") == answer2
     print("All tests passed.")
 
 
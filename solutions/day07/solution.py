@@ -1,9 +1,13 @@
 import itertools
 import pathlib
+import random
 from enum import Enum, auto
 from typing import NamedTuple
 
-import tqdm
+ANSWERS = {
+    "example.txt": (3749, 11387),
+    "input.txt": (66343330034722, 637696070419031),
+}
 
 
 class Equation(NamedTuple):
@@ -42,56 +46,67 @@ def valid(equation: Equation, include_concat: bool = False) -> bool:
 
 
 def read_equations(path: pathlib.Path) -> list[Equation]:
-    equations: list[Equation] = []
-    for i, line in enumerate(path.read_text().rstrip().splitlines()):
-        target, numbers = line.split(": ")
-        equations.append(
-            Equation(
-                id=i,
-                numbers=tuple(int(num) for num in numbers.split()),
-                target=int(target),
-            )
-        )
-    return equations
-
-
-def part1(equations: list[Equation]) -> set[Equation]:
+    # Imported here so that importing the day does not pay for NumPy.
+    from aoc.ints import read_ints
+
+    return [
+        Equation(id=i, numbers=tuple(numbers), target=target)
+        for i, (target, *numbers) in enumerate(read_ints(path).lines())
+    ]
+
+
+parse = read_equations
+
+
+def sum_targets(equations: set[Equation]) -> int:
+    return sum(equation.target for equation in equations)
+
+
+def part1(equations: list[Equation]) -> int:
     valid_ = set[Equation]()
     for equation in equations:
         if valid(equation):
             valid_.add(equation)
-    return valid_
+    return sum_targets(valid_)
+
 
+def part2(equations: list[Equation], disable_progress: bool = False) -> int:
+    import tqdm
 
-def part2(
-    equations: list[Equation],
-    already_valid: set[Equation],
-    disable_progress: bool = False,
-) -> set[Equation]:
+    # NOTE trying without concatenation first is cheap (2^(n-1) instead of 3^(n-1)
+    # combinations) and settles every equation that is already valid in part 1.
     valid_ = set[Equation]()
     for equation in tqdm.tqdm(equations, disable=disable_progress):
-        if equation in already_valid or valid(equation, include_concat=True):
+        if valid(equation) or valid(equation, include_concat=True):
             valid_.add(equation)
-    return valid_
+    return sum_targets(valid_)
 
 
-def sum_targets(equations: set[Equation]) -> int:
-    return sum(equation.target for equation in equations)
-
-
-def main() -> None:
-    equations = read_equations(pathlib.Path("example.txt"))
-    valid_from_part1 = part1(equations)
-    assert sum_targets(valid_from_part1) == 3749
-    assert (
-        sum_targets(part2(equations, valid_from_part1, disable_progress=True)) == 11387
-    )
-
-    equations = read_equations(pathlib.Path("input.txt"))
-    valid_from_part1 = part1(equations)
-    assert sum_targets(valid_from_part1) == 66343330034722
-    assert sum_targets(part2(equations, valid_from_part1)) == 637696070419031
-
+def generate(size: int, rng: random.Random) -> str:
+    # size equations of 2 to 7 numbers, most of them built to be solvable.
+    lines: list[str] = []
+    for _ in range(size):
+        numbers = [rng.randint(1, 99) for _ in range(rng.randint(2, 7))]
+        target = numbers[0]
+        for number in numbers[1:]:
+            match rng.choice(list(Operation)):
+                case Operation.ADD:
+                    target += number
+                case Operation.MULTIPLY:
+                    target *= number
+                case Operation.CONCAT:
+                    target = int(f"{target}{number}")
+        if rng.random() < 0.3:
+            target += 1
+        lines.append(f"{target}: {' '.join(str(number) for number in numbers)}")
+    return "\n".join(lines)
+
+
+def main(directory: pathlib.Path = pathlib.Path(__file__).parent) -> None:
+    for name, (answer1, answer2) in ANSWERS.items():
+        equations = parse(directory / name)
+        assert part1(equations) == answer1
+        assert part2(equations, disable_progress=name == "example.txt") == answer2
     print("All tests passed.")
 
 
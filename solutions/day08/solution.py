@@ -1,19 +1,34 @@
+import math
 import pathlib
+import random
+import string
 from collections import defaultdict
-from typing import Callable
+from typing import Callable, NamedTuple
+
+from aoc.grid import Grid
 
 type Point = tuple[int, int]
 
+EMPTY = ord(".")
+
+ANSWERS = {"example.txt": (14, 34), "input.txt": (276, 991)}
+
+
+class Antennas(NamedTuple):
+    positions: defaultdict[str, list[Point]]
+    rows: int
+    cols: int
 
-def read_grid(path: pathlib.Path) -> list[list[str]]:
-    return [list(line) for line in path.read_text().rstrip().splitlines()]
+
+def read_grid(path: pathlib.Path) -> Grid:
+    return Grid.from_file(path)
 
 
 def is_inside_grid(a: Point, rows: int, cols: int) -> bool:
     return (0 <= a[0] < rows) and (0 <= a[1] < cols)
 
 
-def part1(
+def add_antinodes(
     positions: list[Point],
     rows: int,
     cols: int,
@@ -34,7 +49,7 @@ def part1(
             j += 1
 
 
-def part2(
+def add_resonant_antinodes(
     positions: list[Point],
     rows: int,
     cols: int,
@@ -72,14 +87,11 @@ def part2(
             j += 1
 
 
-def find_antenna_positions(grid: list[list[str]]) -> defaultdict[str, list[Point]]:
+def find_antenna_positions(grid: Grid) -> defaultdict[str, list[Point]]:
     positions = defaultdict[str, list[Point]](list[Point])
-    rows = len(grid)
-    cols = len(grid[0])
-    for i in range(rows):
-        for j in range(cols):
-            if grid[i][j] != ".":
-                positions[grid[i][j]].append((i, j))
+    for index, cell in enumerate(grid.cells):
+        if cell != EMPTY:
+            positions[chr(cell)].append(grid.position(index))
     return positions
 
 
@@ -95,16 +107,40 @@ def solve(
     return len(antinodes)
 
 
-def main() -> None:
-    grid = read_grid(pathlib.Path("example.txt"))
-    antenna_positions = find_antenna_positions(grid)
-    assert solve(antenna_positions, len(grid), len(grid[0]), part1) == 14
-    assert solve(antenna_positions, len(grid), len(grid[0]), part2) == 34
+def read_antennas(path: pathlib.Path) -> Antennas:
+    grid = read_grid(path)
+    return Antennas(find_antenna_positions(grid), grid.rows, grid.cols)
+
+
+parse = read_antennas
+
+
+def part1(antennas: Antennas) -> int:
+    return solve(antennas.positions, antennas.rows, antennas.cols, add_antinodes)
+
+
+def part2(antennas: Antennas) -> int:
+    return solve(
+        antennas.positions, antennas.rows, antennas.cols, add_resonant_antinodes
+    )
+
+
+def generate(size: int, rng: random.Random) -> str:
+    # A square grid of about size cells with an antenna in about one in 16 of them,
+    # tuned to one of the 62 frequencies.
+    n = max(4, math.isqrt(size))
+    cells = [["."] * n for _ in range(n)]
+    for _ in range(max(2, n * n // 16)):
+        frequency = rng.choice(string.ascii_letters + string.digits)
+        cells[rng.randrange(n)][rng.randrange(n)] = frequency
+    return "\n".join("".join(row) for row in cells)
+
 
-    grid = read_grid(pathlib.Path("input.txt"))
-    antenna_positions = find_antenna_positions(grid)
-    assert solve(antenna_positions, len(grid), len(grid[0]), part1) == 276
-    assert solve(antenna_positions, len(grid), len(grid[0]), part2) == 991
+def main(directory: pathlib.Path = pathlib.Path(__file__).parent) -> None:
+    for name, (answer1, answer2) in ANSWERS.items():
+        antennas = parse(directory / name)
+        assert part1(antennas) == answer1
+        assert part2(antennas) == answer2
     print("All tests passed.")
 
 
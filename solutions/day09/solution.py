@@ -1,11 +1,17 @@
 import pathlib
+import random
 from collections import defaultdict
 
+ANSWERS = {"example.txt": (1928, 2858), "input.txt": (6421128769094, 6448168620520)}
+
 
 def read_disk_map(path: pathlib.Path) -> str:
     return path.read_text().rstrip()
 
 
+parse = read_disk_map
+
+
 def make_blocks(disk_map: str) -> list[int | None]:
     blocks: list[int | None] = []
     file_id = 0
@@ -82,15 +88,19 @@ def part2(disk_map: str) -> int:
     return checksum(blocks)
 
 
-def main() -> None:
-    disk_map = read_disk_map(pathlib.Path("example.txt"))
-    assert part1(disk_map) == 1928
-    assert part2(disk_map) == 2858
+def generate(size: int, rng: random.Random) -> str:
+    # A disk map of size digits, alternating files (1-9 blocks) and spaces (0-9).
+    return "".join(
+        str(rng.randint(1, 9) if i % 2 == 0 else rng.randint(0, 9))
+        for i in range(size | 1)
+    )
 
-    disk_map = read_disk_map(pathlib.Path("input.txt"))
-    assert part1(disk_map) == 6421128769094
-    assert part2(disk_map) == 6448168620520
 
+def main(directory: pathlib.Path = pathlib.Path(__file__).parent) -> None:
+    for name, (answer1, answer2) in ANSWERS.items():
+        disk_map = parse(directory / name)
+        assert part1(disk_map) == answer1
+        assert part2(disk_map) == answer2
     print("All tests passed.")
 
 
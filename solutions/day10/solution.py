@@ -1,82 +1,54 @@
 from __future__ import annotations
 
+import math
+import random
 from collections import deque
-from dataclasses import dataclass
 from pathlib import Path
 
+from aoc import metrics
+from aoc.grid import Grid
 
-@dataclass(frozen=True)
-class Point:
-    x: int
-    y: int
+ANSWERS = {"example.txt": (36, 81), "input.txt": (825, 1805)}
 
-    def __add__(self, other: Point) -> Point:
-        return Point(self.x + other.x, self.y + other.y)
+TOP = ord("9")
 
 
 class Map:
-    def __init__(self, heights: list[list[int]]):
+    # Heights are the digits' bytes and positions flat indices of the grid. The border
+    # around it is never one higher than a height, so trails cannot leave the map.
+    def __init__(self, heights: Grid):
         self.heights = heights
 
-    def __getitem__(self, position: Point) -> int:
-        return self.heights[position.x][position.y]
-
-    @property
-    def rows(self):
-        return len(self.heights)
-
-    @property
-    def cols(self):
-        return len(self.heights[0])
-
-    def within_bounds(self, position: Point) -> bool:
-        return (0 <= position.x < self.rows) and (0 <= position.y < self.cols)
-
     @classmethod
     def from_file(cls, path: Path) -> Map:
-        return Map(
-            [
-                list(int(height) for height in line)
-                for line in path.read_text().splitlines()
-            ]
-        )
+        return Map(Grid.from_file(path, border=1))
 
-    def get_neighbors(self, position: Point) -> list[Point]:
-        return [
-            neighbor
-            for direction in (Point(0, 1), Point(1, 0), Point(0, -1), Point(-1, 0))
-            if self.within_bounds(neighbor := (position + direction))
-        ]
-
-    def find_zeros(self) -> list[Point]:
-        zeros: list[Point] = []
-        for i in range(self.rows):
-            for j in range(self.cols):
-                if self[point := Point(i, j)] == 0:
-                    zeros.append(point)
-        return zeros
-
-    def bfs(self, source: Point, rating: bool) -> int:
+    def find_zeros(self) -> list[int]:
+        return self.heights.locate_all("0")
+
+    def bfs(self, source: int, rating: bool) -> int:
+        cells, offsets = self.heights.cells, self.heights.offsets
         score = 0
-        visited = set[Point]([source])
-        queue = deque[Point]([source])
+        visited = set[int]([source])
+        queue = deque[int]([source])
+        expansions = 0
         while queue:
             current = queue.popleft()
-            for neighbor in self.get_neighbors(current):
-                if neighbor not in visited and (self[neighbor] - self[current]) == 1:
+            expansions += 1
+            height = cells[current] + 1
+            for offset in offsets:
+                neighbor = current + offset
+                if neighbor not in visited and cells[neighbor] == height:
                     queue.append(neighbor)
                     if not rating:
                         visited.add(neighbor)
-                    if self[neighbor] == 9:
+                    if height == TOP:
                         score += 1
+        metrics.add("bfs expansions", expansions)
         return score
 
     def __str__(self) -> str:
-        content = ""
-        for row in self.heights:
-            content += "".join(str(height) for height in row)
-            content += "\n"
-        return content.rstrip()
+        return str(self.heights)
 
     def _solve(self, rating: bool) -> int:
         return sum(self.bfs(zero, rating=rating) for zero in self.find_zeros())
@@ -88,15 +60,29 @@ class Map:
         return self._solve(rating=True)
 
 
-def main() -> None:
-    map = Map.from_file(Path("example.txt"))
-    assert map.part1() == 36
-    assert map.part2() == 81
+def generate(size: int, rng: random.Random) -> str:
+    # A square map of about size cells, with heights mostly rising along the
+    # diagonals so that there are plenty of trails.
+    n = max(4, math.isqrt(size))
+    return "\n".join(
+        "".join(
+            str((i + j) % 10 if rng.random() < 0.8 else rng.randint(0, 9))
+            for j in range(n)
+        )
+        for i in range(n)
+    )
+
+
+parse = Map.from_file
+part1 = Map.part1
+part2 = Map.part2
 
-    map = Map.from_file(Path("input.txt"))
-    assert map.part1() == 825
-    assert map.part2() == 1805
 
+def main(directory: Path = Path(__file__).parent) -> None:
+    for name, (answer1, answer2) in ANSWERS.items():
+        map = parse(directory / name)
+        assert part1(map) == answer1
+        assert part2(map) == answer2
     print("All tests passed.")
 
 
@@ -1,4 +1,5 @@
 from collections import defaultdict
+from pathlib import Path
 
 
 def read(arrangement: str) -> list[int]:
@@ -38,7 +39,7 @@ def blink_many_times(stones: list[int], n: int) -> int:
     return sum(stone_counts.values())
 
 
-def main() -> None:
+def main(directory: Path = Path(__file__).parent) -> None:
     stones = read("125 17")
     assert blink_many_times(stones, 25) == 55312
     assert blink_many_times(stones, 75) == 65601038650482
@@ -1,23 +1,28 @@
 from __future__ import annotations
 
+import math
+import random
 from collections import deque
 from dataclasses import dataclass
 from functools import cache
 from pathlib import Path
 
-from rich import print
+from aoc import metrics
+from aoc.grid import EAST, NORTH, SOUTH, WEST, Grid
 
+ANSWERS = {
+    "example1.txt": (1930, 1206),
+    "example2.txt": (140, 80),
+    "example3.txt": (772, 436),
+    "example4.txt": (None, 236),
+    "example5.txt": (None, 368),
+    "input.txt": (1477762, 923480),
+}
 
-@dataclass(frozen=True)
-class Point:
-    x: int
-    y: int
 
-    def __add__(self, other: Point) -> Point:
-        return Point(self.x + other.x, self.y + other.y)
-
-
-DIRECTIONS = set([Point(0, 1), Point(1, 0), Point(0, -1), Point(-1, 0)])
+# Walls are bit masks of the directions in which a plot has no neighbour.
+NORTH_SOUTH = 1 << NORTH | 1 << SOUTH
+EAST_WEST = 1 << EAST | 1 << WEST
 
 
 @dataclass
@@ -35,110 +40,86 @@ class Region:
 
 
 class Garden:
-    def __init__(self, plots: list[list[str]]):
+    # Positions are flat indices of the grid. The border around the plots is no
+    # plant, so it is never in a region.
+    def __init__(self, plots: Grid):
         self.plots = plots
-        self.all_visited = set[Point]()
+        self.all_visited = set[int]()
         self.regions = list[Region]()
         self.find_regions()
 
-    def __getitem__(self, position: Point) -> str:
-        return self.plots[position.x][position.y]
-
-    @property
-    def rows(self):
-        return len(self.plots)
-
-    @property
-    def cols(self):
-        return len(self.plots[0])
-
-    def within_bounds(self, position: Point) -> bool:
-        return (0 <= position.x < self.rows) and (0 <= position.y < self.cols)
-
     @classmethod
     def from_file(cls, path: Path) -> Garden:
-        return Garden([list(line) for line in path.read_text().splitlines()])
+        return Garden(Grid.from_file(path, border=1))
 
     @cache
-    def _get_neighbors_and_walls(
-        self, position: Point
-    ) -> tuple[list[Point], set[Point]]:
-        neighbors: list[Point] = []
-        directions = set[Point]()
-        for direction in DIRECTIONS:
-            neighbor = position + direction
-            if self.within_bounds(neighbor) and self[neighbor] == self[position]:
+    def _get_neighbors_and_walls(self, position: int) -> tuple[list[int], int]:
+        cells = self.plots.cells
+        neighbors: list[int] = []
+        walls = 0
+        for direction, offset in enumerate(self.plots.offsets):
+            if cells[neighbor := position + offset] == cells[position]:
                 neighbors.append(neighbor)
-                directions.add(direction)
-        return neighbors, (DIRECTIONS - directions)
+            else:
+                walls |= 1 << direction
+        return neighbors, walls
 
-    def get_neighbors(self, position: Point) -> list[Point]:
+    def get_neighbors(self, position: int) -> list[int]:
         neighbors, _ = self._get_neighbors_and_walls(position)
         return neighbors
 
-    def get_walls(self, position: Point) -> set[Point]:
+    def get_walls(self, position: int) -> int:
         _, walls = self._get_neighbors_and_walls(position)
         return walls
 
     @staticmethod
-    def inner_corners(walls: set[Point]) -> int:
-        if len(walls) == 4:
-            return 4
-        if len(walls) == 3:
-            return 2
-        if len(walls) == 2:
-            if (
-                walls == set([Point(0, 1), Point(1, 0)])
-                or walls == set([Point(0, 1), Point(-1, 0)])
-                or walls == set([Point(0, -1), Point(1, 0)])
-                or walls == set([Point(0, -1), Point(-1, 0)])
-            ):
+    def inner_corners(walls: int) -> int:
+        match walls.bit_count():
+            case 4:
+                return 4
+            case 3:
+                return 2
+            case 2 if walls != NORTH_SOUTH and walls != EAST_WEST:
                 return 1
         return 0
 
     @staticmethod
     def outer_corner(
-        position: Point,
-        direction1: Point,
-        direction2: Point,
-        in_region: set[Point],
+        position: int, offset1: int, offset2: int, in_region: set[int]
     ) -> bool:
         return (
-            (position + direction1) in in_region
-            and (position + direction2) in in_region
-            and (position + direction1 + direction2) not in in_region
+            (position + offset1) in in_region
+            and (position + offset2) in in_region
+            and (position + offset1 + offset2) not in in_region
         )
 
-    def outer_corners(self, position: Point, in_region: set[Point]) -> int:
+    def outer_corners(self, position: int, in_region: set[int]) -> int:
+        north, east, south, west = self.plots.offsets
         corners = 0
-        corners += int(
-            self.outer_corner(position, Point(-1, 0), Point(0, 1), in_region)
-        )
-        corners += int(
-            self.outer_corner(position, Point(-1, 0), Point(0, -1), in_region)
-        )
-        corners += int(self.outer_corner(position, Point(1, 0), Point(0, 1), in_region))
-        corners += int(
-            self.outer_corner(position, Point(1, 0), Point(0, -1), in_region)
-        )
+        corners += int(self.outer_corner(position, north, east, in_region))
+        corners += int(self.outer_corner(position, north, west, in_region))
+        corners += int(self.outer_corner(position, south, east, in_region))
+        corners += int(self.outer_corner(position, south, west, in_region))
         return corners
 
     def find_regions(self) -> None:
-        for i in range(self.rows):
-            for j in range(self.cols):
-                self.find_region(Point(i, j))
+        for i in range(self.plots.rows):
+            for j in range(self.plots.cols):
+                self.find_region(self.plots.index(i, j))
 
-    def find_region(self, source: Point) -> None:
-        in_region = set[Point]()
+    def find_region(self, source: int) -> None:
+        in_region = set[int]()
         if source in self.all_visited:
             return
         self.all_visited.add(source)
         in_region.add(source)
         perimeter, area = 4 - len(self.get_neighbors(source)), 1
         corners = self.inner_corners(self.get_walls(source))
-        queue = deque[Point]([source])
+        queue = deque[int]([source])
+        expansions = 0
         while queue:
             current = queue.popleft()
+            expansions += 1
             for neighbor in self.get_neighbors(current):
                 if neighbor not in self.all_visited:
                     queue.append(neighbor)
@@ -147,11 +128,12 @@ class Garden:
                     perimeter += 4 - len(self.get_neighbors(neighbor))
                     area += 1
                     corners += self.inner_corners(self.get_walls(neighbor))
+        metrics.add("bfs expansions", expansions)
         for position in in_region:
             corners += self.outer_corners(position, in_region)
         self.regions.append(
             Region(
-                plant=self[source],
+                plant=chr(self.plots.cells[source]),
                 area=area,
                 perimeter=perimeter,
                 corners=corners,
@@ -166,29 +148,33 @@ class Garden:
         return sum(region.price_part2() for region in self.regions)
 
 
-def main() -> None:
-    garden = Garden.from_file(Path("example1.txt"))
-    assert garden.part1() == 1930
-    assert garden.part2() == 1206
-
-    garden = Garden.from_file(Path("example2.txt"))
-    assert garden.part1() == 140
-    assert garden.part2() == 80
+def generate(size: int, rng: random.Random) -> str:
+    # A square garden of about size plots, where plots mostly copy a neighbour's
+    # plant so that regions grow into irregular blobs.
+    n = max(4, math.isqrt(size))
+    plots = [[""] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(n):
+            neighbors = [plots[i - 1][j]] * (i > 0) + [plots[i][j - 1]] * (j > 0)
+            if neighbors and rng.random() < 0.85:
+                plots[i][j] = rng.choice(neighbors)
+            else:
+                plots[i][j] = rng.choice("ABCDE")
+    return "\n".join("".join(row) for row in plots)
 
-    garden = Garden.from_file(Path("example3.txt"))
-    assert garden.part1() == 772
-    assert garden.part2() == 436
 
-    garden = Garden.from_file(Path("example4.txt"))
-    assert garden.part2() == 236
+parse = Garden.from_file
+part1 = Garden.part1
+part2 = Garden.part2
 
-    garden = Garden.from_file(Path("example5.txt"))
-    assert garden.part2() == 368
 
-    garden = Garden.from_file(Path("input.txt"))
-    assert garden.part1() == 1477762
-    assert garden.part2() == 923480
+def main(directory: Path = Path(__file__).parent) -> None:
+    from rich import print
 
+    for name, (answer1, answer2) in ANSWERS.items():
+        garden = parse(directory / name)
+        assert answer1 is None or part1(garden) == answer1
+        assert part2(garden) == answer2
     print("All tests passed.")
 
 
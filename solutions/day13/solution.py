@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-import re
+import random
 from dataclasses import dataclass
 from fractions import Fraction
 from pathlib import Path
 from typing import NamedTuple
 
+ANSWERS = {"example.txt": (480, None), "input.txt": (27157, 104015411578548)}
+
 
 class CannotWinError(Exception):
     pass
@@ -23,13 +25,16 @@ class ClawMachine:
     prize: Position
 
     @classmethod
-    def from_config(cls, config: str) -> ClawMachine:
-        a_x, a_y, b_x, b_y, p_x, p_y = [int(x) for x in re.findall((r"(\d+)"), config)]
+    def from_ints(
+        cls, a_x: int, a_y: int, b_x: int, b_y: int, p_x: int, p_y: int
+    ) -> ClawMachine:
         return cls(Position(a_x, a_y), Position(b_x, b_y), Position(p_x, p_y))
 
-    def correct_prize_position(self) -> None:
-        self.prize = Position(
-            self.prize.x + 10000000000000, self.prize.y + 10000000000000
+    def with_corrected_prize_position(self) -> ClawMachine:
+        return ClawMachine(
+            self.a,
+            self.b,
+            Position(self.prize.x + 10000000000000, self.prize.y + 10000000000000),
         )
 
     def fewest_tokens_to_win(self) -> int:
@@ -48,9 +53,12 @@ class ClawMachine:
 
 
 def get_machines(path: Path) -> list[ClawMachine]:
+    # Imported here so that importing the day does not pay for NumPy.
+    from aoc.ints import read_ints
+
     return [
-        ClawMachine.from_config(config)
-        for config in path.read_text().rstrip().split("\n\n")
+        ClawMachine.from_ints(*config)
+        for config in read_ints(path).values.reshape(-1, 6).tolist()
     ]
 
 
@@ -64,15 +72,40 @@ def solve(machines: list[ClawMachine]) -> int:
     return answer
 
 
-def main() -> None:
-    machines = get_machines(Path("example.txt"))
-    assert solve(machines) == 480
+def generate(size: int, rng: random.Random) -> str:
+    # size claw machines, most of which can win.
+    configs: list[str] = []
+    while len(configs) < size:
+        a = Position(rng.randint(10, 99), rng.randint(10, 99))
+        b = Position(rng.randint(10, 99), rng.randint(10, 99))
+        if b.y * a.x == b.x * a.y:
+            continue
+        presses_a, presses_b = rng.randint(1, 100), rng.randint(1, 100)
+        prize = Position(
+            presses_a * a.x + presses_b * b.x + (rng.random() < 0.3),
+            presses_a * a.y + presses_b * b.y,
+        )
+        configs.append(
+            f"Button A: X+{a.x}, Y+{a.y}\n"
+            f"Button B: X+{b.x}, Y+{b.y}\n"
+            f"Prize: X={prize.x}, Y={prize.y}"
+        )
+    return "\n\n".join(configs)
 
-    machines = get_machines(Path("input.txt"))
-    assert solve(machines) == 27157
-    for machine in machines:
-        machine.correct_prize_position()
-    assert solve(machines) == 104015411578548
+
+parse = get_machines
+part1 = solve
+
+
+def part2(machines: list[ClawMachine]) -> int:
+    return solve([machine.with_corrected_prize_position() for machine in machines])
+
+
+def main(directory: Path = Path(__file__).parent) -> None:
+    for name, (answer1, answer2) in ANSWERS.items():
+        machines = parse(directory / name)
+        assert part1(machines) == answer1
+        assert answer2 is None or part2(machines) == answer2
     print("All tests passed.")
 
 
@@ -1,47 +1,52 @@
 from __future__ import annotations
 
+import random
 from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
+from typing import NamedTuple
 
+type Vector = tuple[int, int]
 
-@dataclass(frozen=True)
-class Vector:
-    x: int
-    y: int
+ANSWERS = {"example.txt": (12, None), "input.txt": (221655456, 7858)}
 
-    def __add__(self, other: Vector) -> Vector:
-        return Vector(self.x + other.x, self.y + other.y)
+# The example is smaller than the real space, which generated inputs use too.
+SIZES = {"example.txt": (11, 7)}
+WIDTH, HEIGHT = 101, 103
+
+
+class Space(NamedTuple):
+    robots: list[tuple[Vector, Vector]]
+    width: int
+    height: int
 
 
 @dataclass
 class Robot:
-    position: Vector
+    # The position packed as y * width + x.
+    position: int
     velocity: Vector
 
 
 class World:
-    def __init__(self, path: Path, width: int, height: int) -> None:
-        self.width, self.height = width, height
+    def __init__(self, space: Space) -> None:
+        width = self.width = space.width
+        self.height = space.height
         self.robots: list[Robot] = []
-        for line in path.read_text().rstrip().splitlines():
-            left, right = line.split()
-            x, y = left.split("p=")[-1].split(",")
-            position = Vector(int(x), int(y))
-            vx, vy = right.split("v=")[-1].split(",")
-            velocity = Vector(int(vx), int(vy))
-            self.robots.append(Robot(position=position, velocity=velocity))
-        self.positions = defaultdict[Vector, int](int)
+        for (x, y), velocity in space.robots:
+            self.robots.append(Robot(position=y * width + x, velocity=velocity))
+        self.positions = defaultdict[int, int](int)
         for robot in self.robots:
             self.positions[robot.position] += 1
 
     def evolve(self, steps: int = 1) -> None:
+        width, height = self.width, self.height
         for robot in self.robots:
             self.positions[robot.position] -= 1
-            robot.position = Vector(
-                x=(robot.position.x + steps * robot.velocity.x) % self.width,
-                y=(robot.position.y + steps * robot.velocity.y) % self.height,
-            )
+            y, x = divmod(robot.position, width)
+            vx, vy = robot.velocity
+            x, y = (x + steps * vx) % width, (y + steps * vy) % height
+            robot.position = y * width + x
             self.positions[robot.position] += 1
 
     def quadrant_counts(self) -> tuple[int, int, int, int]:
@@ -54,14 +59,14 @@ class World:
             0,
         )
         for robot in self.robots:
-            position = robot.position
-            if position.x < mid_width and position.y < mid_height:
+            y, x = divmod(robot.position, self.width)
+            if x < mid_width and y < mid_height:
                 a += 1
-            elif position.x < mid_width and position.y > mid_height:
+            elif x < mid_width and y > mid_height:
                 c += 1
-            elif position.x > mid_width and position.y > mid_height:
+            elif x > mid_width and y > mid_height:
                 d += 1
-            elif position.x > mid_width and position.y < mid_height:
+            elif x > mid_width and y < mid_height:
                 b += 1
         return a, b, c, d
 
@@ -73,7 +78,7 @@ class World:
         for y in range(self.height):
             row = ""
             for x in range(self.width):
-                tiles = self.positions[Vector(x, y)]
+                tiles = self.positions[y * self.width + x]
                 if tiles == 0:
                     row += " "
                 else:
@@ -82,41 +87,73 @@ class World:
 
 
 def read(path: Path) -> list[tuple[Vector, Vector]]:
-    output: list[tuple[Vector, Vector]] = []
-    for line in path.read_text().rstrip().splitlines():
-        left, right = line.split()
-        x, y = left.split("p=")[-1].split(",")
-        position = Vector(int(x), int(y))
-        x, y = right.split("v=")[-1].split(",")
-        velocity = Vector(int(x), int(y))
-        output.append((position, velocity))
-    return output
-
-
-def part1(path: Path, width: int, height: int) -> int:
-    world = World(path, width, height)
-    world.evolve(100)
-    return world.safety_factor()
+    # Imported here so that importing the day does not pay for NumPy.
+    from aoc.ints import read_ints
+
+    return [
+        ((x, y), (vx, vy))
+        for x, y, vx, vy in read_ints(path).values.reshape(-1, 4).tolist()
+    ]
+
 
+def read_space(path: Path) -> Space:
+    width, height = SIZES.get(path.name, (WIDTH, HEIGHT))
+    return Space(read(path), width, height)
 
-def part2(path: Path, width: int, height: int) -> None:
-    world = World(path, width, height)
-    t = 81
-    dt = 101
-    world.evolve(t)
-    while True:
-        print(f"{t=}")
-        world.show()
-        input()
-        world.evolve(dt)
-        t += dt
+
+parse = read_space
+
+
+def part1(space: Space) -> int:
+    world = World(space)
+    world.evolve(100)
+    return world.safety_factor()
 
 
-def main() -> None:
-    assert part1(Path("example.txt"), 11, 7) == 12
-    assert part1(Path("input.txt"), 101, 103) == 221655456
+def spread(values: list[int]) -> int:
+    # The variance times the square of the count, which orders the same way.
+    return len(values) * sum(v * v for v in values) - sum(values) ** 2
+
+
+def tightest(starts: list[int], velocities: list[int], period: int) -> int:
+    # The time within a period when the robots are least spread along one axis.
+    moves = list(zip(starts, velocities))
+    return min(
+        range(period), key=lambda t: spread([(p + t * v) % period for p, v in moves])
+    )
+
+
+def part2(space: Space) -> int:
+    # Robots gather into the tree along each axis at the time their spread along it
+    # is smallest, which repeats with the width for x and the height for y. The tree
+    # is at the first time that is both (Chinese remainder theorem).
+    width, height = space.width, space.height
+    t_x = tightest(
+        [x for (x, _), _ in space.robots], [vx for _, (vx, _) in space.robots], width
+    )
+    t_y = tightest(
+        [y for (_, y), _ in space.robots], [vy for _, (_, vy) in space.robots], height
+    )
+    return t_x + width * ((t_y - t_x) * pow(width, -1, height) % height)
+
+
+def generate(size: int, rng: random.Random) -> str:
+    # size robots anywhere in the real space, moving up to 100 tiles a second.
+    return "\n".join(
+        f"p={rng.randrange(WIDTH)},{rng.randrange(HEIGHT)} "
+        f"v={rng.randint(-100, 100)},{rng.randint(-100, 100)}"
+        for _ in range(size)
+    )
+
+
+def main(directory: Path = Path(__file__).parent) -> None:
+    for name, (answer1, answer2) in ANSWERS.items():
+        space = parse(directory / name)
+        assert part1(space) == answer1
+        if answer2 is not None:
+            assert part2(space) == answer2
     print("All tests passed.")
-    # part2(Path("input.txt"), 101, 103)  #  ... you will see it at t=7858
+    # World(parse(directory / "input.txt")).evolve(7858) and show() to see the tree.
 
 
 if __name__ == "__main__":
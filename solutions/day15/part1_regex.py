@@ -2,6 +2,8 @@ import re
 from pathlib import Path
 from typing import Literal
 
+from aoc.grid import Grid
+
 type Point = tuple[int, int]
 type Warehouse = list[list[str]]
 type Move = Literal[">", "<", "^", "v"]
@@ -71,8 +73,17 @@ def part1(warehouse: Warehouse, moves: list[Move]) -> int:
     return score
 
 
-def main() -> None:
-    warehouse, moves = read_input(Path("input.txt"))
+def part1_from_tiles(puzzle: tuple[Grid, str]) -> int:
+    # Takes the input as parsed by solution.py, so that the two can be compared.
+    tiles, moves = puzzle
+    return part1([list(row) for row in str(tiles).splitlines()], list(moves))  # pyright: ignore[reportArgumentType]
+
+
+VARIANTS = {"part1": {"regex": part1_from_tiles}}
+
+
+def main(directory: Path = Path(__file__).parent) -> None:
+    warehouse, moves = read_input(directory / "input.txt")
     assert part1(warehouse, moves) == 1490942
     print("All tests passed.")
 
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import math
+import random
 from collections import deque
 from dataclasses import dataclass
 from enum import StrEnum
-from functools import cache
 from pathlib import Path
 
+from aoc import metrics
+from aoc.grid import EAST, NORTH, SOUTH, WEST, Grid
+
+ANSWERS = {"example.txt": (10092, 9021), "input.txt": (1490942, 1519202)}
+
 
 class EntityType(StrEnum):
     WALL = "#"
@@ -14,36 +20,24 @@ class EntityType(StrEnum):
     BOX2 = "[]"
 
 
-@cache
-def move_to_direction(move: str) -> Vector:
+def move_to_direction(move: str) -> int:
     match move:
         case ">":
-            return Vector(0, 1)
+            return EAST
         case "<":
-            return Vector(0, -1)
+            return WEST
         case "v":
-            return Vector(1, 0)
+            return SOUTH
         case "^":
-            return Vector(-1, 0)
+            return NORTH
         case _:
             raise ValueError("unknown move")
 
 
-@dataclass(frozen=True)
-class Vector:
-    x: int
-    y: int
-
-    def __add__(self, other: Vector) -> Vector:
-        return Vector(self.x + other.x, self.y + other.y)
-
-    def __mul__(self, scalar: int) -> Vector:
-        return Vector(scalar * self.x, scalar * self.y)
-
-
 @dataclass
 class Entity:
-    positions: tuple[Vector, ...]
+    # Flat indices of the tiles grid.
+    positions: tuple[int, ...]
     type: EntityType
 
     @property
@@ -51,33 +45,34 @@ class Entity:
         return self.type is EntityType.BOX1 or self.type is EntityType.BOX2
 
 
+ENLARGED = {ord("@"): b"@.", ord("O"): b"[]", ord("#"): b"##", ord("."): b".."}
+
+
+def enlarge_tiles(tiles: Grid) -> Grid:
+    try:
+        return Grid.from_lines(
+            [
+                b"".join(ENLARGED[tile] for tile in tiles.row(x))
+                for x in range(tiles.rows)
+            ]
+        )
+    except KeyError:
+        raise ValueError("unknown tile type")
+
+
 class Warehouse:
-    def __init__(self, tiles: list[str], enlarge: bool = False):
+    def __init__(self, tiles: Grid, enlarge: bool = False):
         if enlarge:
-            new_tiles: list[str] = []
-            for row in tiles:
-                new_row = ""
-                for char in row:
-                    match char:
-                        case "@":
-                            new_row += "@."
-                        case "O":
-                            new_row += "[]"
-                        case "#":
-                            new_row += "##"
-                        case ".":
-                            new_row += ".."
-                        case _:
-                            raise ValueError("unknown tile type")
-                new_tiles.append(new_row)
-            tiles = new_tiles
-
-        self.positions: dict[Vector, Entity] = {}
-        for x, row in enumerate(tiles):
+            tiles = enlarge_tiles(tiles)
+
+        self.width, self.offsets = tiles.width, tiles.offsets
+        self.positions: dict[int, Entity] = {}
+        for x in range(tiles.rows):
+            row = tiles.row(x)
             y = 0
             while y < len(row):
-                tile = row[y]
-                position = Vector(x, y)
+                tile = chr(row[y])
+                position = tiles.index(x, y)
                 match tile:
                     case "#":
                         self.positions[position] = Entity(
@@ -88,7 +83,7 @@ class Warehouse:
                             positions=(position,), type=EntityType.BOX1
                         )
                     case "[":
-                        second_position = position + Vector(0, 1)
+                        second_position = position + 1
                         entity = Entity(
                             positions=(position, second_position), type=EntityType.BOX2
                         )
@@ -107,18 +102,14 @@ class Warehouse:
                     case _:
                         raise ValueError("unknown tile")
                 y += 1
-        self.max_x, self.max_y = (
-            max(self.positions, key=lambda p: p.x).x + 1,
-            max(self.positions, key=lambda p: p.y).y + 1,
-        )
+        self.max_x, self.max_y = tiles.rows, tiles.cols
 
     def show(self) -> None:
         for x in range(self.max_x):
             row = ""
             y = 0
             while y < self.max_y:
-                position = Vector(x, y)
-                entity = self.positions.get(position)
+                entity = self.positions.get(x * self.width + y)
                 if entity is None:
                     row += "."
                 else:
@@ -128,30 +119,21 @@ class Warehouse:
                 y += 1
             print(row)
 
-    def get_neighbors(self, direction: Vector, entity: Entity) -> list[Entity]:
+    def get_neighbors(self, direction: int, entity: Entity) -> list[Entity]:
         neighbors = list[Entity]()
-        match direction:
-            case Vector(0, 1):
-                if (
-                    neighbor := self.positions.get(entity.positions[-1] + direction)
-                ) is not None:
-                    neighbors.append(neighbor)
-            case Vector(0, -1):
-                if (
-                    neighbor := self.positions.get(entity.positions[0] + direction)
-                ) is not None:
-                    neighbors.append(neighbor)
-            case Vector(1, 0) | Vector(-1, 0):
-                for position in entity.positions:
-                    if (
-                        neighbor := self.positions.get(position + direction)
-                    ) is not None:
-                        neighbors.append(neighbor)
-            case _:
-                raise RuntimeError("invalid direction")
+        offset = self.offsets[direction]
+        if direction == EAST:
+            positions = entity.positions[-1:]
+        elif direction == WEST:
+            positions = entity.positions[:1]
+        else:
+            positions = entity.positions
+        for position in positions:
+            if (neighbor := self.positions.get(position + offset)) is not None:
+                neighbors.append(neighbor)
         return neighbors
 
-    def evolve(self, direction: Vector) -> None:
+    def evolve(self, direction: int) -> None:
         robot = self.positions[self.robot_position]
         queue = deque[Entity]([robot])
         visited: list[Entity] = [robot]
@@ -163,13 +145,14 @@ class Warehouse:
                         return
                     queue.append(neighbor)
                     visited.append(neighbor)
+        # The robot and every box it moves along.
+        metrics.add("entities pushed", len(visited))
+        offset = self.offsets[direction]
         new_entities: list[Entity] = []
         for entity in visited:
             new_entities.append(
                 Entity(
-                    positions=tuple(
-                        position + direction for position in entity.positions
-                    ),
+                    positions=tuple(position + offset for position in entity.positions),
                     type=entity.type,
                 )
             )
@@ -185,31 +168,60 @@ class Warehouse:
         for move in moves:
             self.evolve(move_to_direction(move))
         gps_sum = 0
-        seen = set[Vector]()
+        seen = set[int]()
         for entity in self.positions.values():
             if entity.is_box and (position := entity.positions[0]) not in seen:
-                gps_sum += 100 * position.x + position.y
+                x, y = divmod(position, self.width)
+                gps_sum += 100 * x + y
                 seen.add(position)
         return gps_sum
 
 
-def read_input(path: Path) -> tuple[list[str], str]:
+def read_input(path: Path) -> tuple[Grid, str]:
     tiles, moves = path.read_text().rstrip().split("\n\n")
     moves = moves.replace("\n", "")
-    return tiles.splitlines(), moves
+    return Grid.from_text(tiles), moves
+
+
+def generate(size: int, rng: random.Random) -> str:
+    # A walled square warehouse of about size tiles and size moves.
+    n = max(5, math.isqrt(size))
+    tiles = [
+        [
+            "#"
+            if i in (0, n - 1) or j in (0, n - 1) or rng.random() < 0.05
+            else rng.choice("O....")
+            for j in range(n)
+        ]
+        for i in range(n)
+    ]
+    tiles[rng.randint(1, n - 2)][rng.randint(1, n - 2)] = "@"
+    moves = "".join(rng.choices("<>^v", k=size))
+    return (
+        "\n".join("".join(row) for row in tiles)
+        + "\n\n"
+        + "\n".join(moves[i : i + 1000] for i in range(0, len(moves), 1000))
+    )
+
+
+parse = read_input
+
+
+def part1(puzzle: tuple[Grid, str]) -> int:
+    tiles, moves = puzzle
+    return Warehouse(tiles).gps_sum_after_moves(moves)
+
 
+def part2(puzzle: tuple[Grid, str]) -> int:
+    tiles, moves = puzzle
+    return Warehouse(tiles, enlarge=True).gps_sum_after_moves(moves)
 
-def main() -> None:
-    tiles, moves = read_input(Path("example.txt"))
-    assert Warehouse(tiles).gps_sum_after_moves(moves) == 10092
-    warehouse = Warehouse(tiles, enlarge=True)
-    # warehouse.show()
-    assert warehouse.gps_sum_after_moves(moves) == 9021
-    # warehouse.show()
 
-    tiles, moves = read_input(Path("input.txt"))
-    assert Warehouse(tiles).gps_sum_after_moves(moves) == 1490942
-    assert Warehouse(tiles, enlarge=True).gps_sum_after_moves(moves) == 1519202
+def main(directory: Path = Path(__file__).parent) -> None:
+    for name, (answer1, answer2) in ANSWERS.items():
+        puzzle = parse(directory / name)
+        assert part1(puzzle) == answer1
+        assert part2(puzzle) == answer2
     print("All tests passed.")
 
 
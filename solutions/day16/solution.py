@@ -1,144 +1,171 @@
 from __future__ import annotations
 
+import math
+import random
 from collections import defaultdict, deque
-from dataclasses import dataclass, field
 from heapq import heappop, heappush
 from pathlib import Path
 
-INF = 100000000
-
-
-@dataclass(frozen=True)
-class Vector:
-    i: int
-    j: int
+from aoc import metrics
+from aoc.grid import EAST, NORTH, SOUTH, WEST, Grid, pack, unpack
 
-    def __add__(self, other: Vector) -> Vector:
-        return Vector(self.i + other.i, self.j + other.j)
+INF = 100000000
 
+ANSWERS = {
+    "example1.txt": (7036, 45),
+    "example2.txt": (11048, 64),
+    "example3.txt": (1006, 7),
+    "example4.txt": (1025, 26),
+    "input.txt": (98416, 471),
+}
 
-@dataclass(frozen=True)
-class State:
-    position: Vector
-    velocity: Vector
 
+WALL = ord("#")
 
-@dataclass(order=True)
-class MazePath:
-    head: State = field(compare=False)
-    cost: int = INF
+# The directions tried from each direction: straight on first, then the turns.
+MOVES = {
+    NORTH: (NORTH, EAST, WEST),
+    SOUTH: (SOUTH, EAST, WEST),
+    EAST: (EAST, SOUTH, NORTH),
+    WEST: (WEST, SOUTH, NORTH),
+}
 
 
 class Maze:
-    def __init__(self, tiles: list[str]):
+    # A state is a position, a flat index of the grid, packed with the direction
+    # of the last move.
+    def __init__(self, tiles: Grid):
         self.tiles = tiles
-
-    def __getitem__(self, position: Vector) -> str:
-        return self.tiles[position.i][position.j]
-
-    @property
-    def rows(self):
-        return len(self.tiles)
-
-    @property
-    def cols(self):
-        return len(self.tiles[0])
+        offsets = tiles.offsets
+        self.moves = [
+            [(direction, offsets[direction]) for direction in MOVES[heading]]
+            for heading in range(4)
+        ]
 
     @classmethod
     def from_file(cls, path: Path) -> Maze:
-        return cls([line for line in path.read_text().rstrip().splitlines()])
-
-    def get_neighbors(self, state: State) -> list[State]:
-        match state:
-            case State(position=position, velocity=Vector(-1, 0)):
-                states = [
-                    State(position=position + Vector(-1, 0), velocity=Vector(-1, 0)),
-                    State(position=position + Vector(0, 1), velocity=Vector(0, 1)),
-                    State(position=position + Vector(0, -1), velocity=Vector(0, -1)),
-                ]
-            case State(position=position, velocity=Vector(1, 0)):
-                states = [
-                    State(position=position + Vector(1, 0), velocity=Vector(1, 0)),
-                    State(position=position + Vector(0, 1), velocity=Vector(0, 1)),
-                    State(position=position + Vector(0, -1), velocity=Vector(0, -1)),
-                ]
-            case State(position=position, velocity=Vector(0, 1)):
-                states = [
-                    State(position=position + Vector(0, 1), velocity=Vector(0, 1)),
-                    State(position=position + Vector(1, 0), velocity=Vector(1, 0)),
-                    State(position=position + Vector(-1, 0), velocity=Vector(-1, 0)),
-                ]
-            case State(position=position, velocity=Vector(0, -1)):
-                states = [
-                    State(position=position + Vector(0, -1), velocity=Vector(0, -1)),
-                    State(position=position + Vector(1, 0), velocity=Vector(1, 0)),
-                    State(position=position + Vector(-1, 0), velocity=Vector(-1, 0)),
-                ]
-            case _:
-                raise RuntimeError("unhandled state")
-        return [state for state in states if self[state.position] != "#"]
+        return cls(Grid.from_file(path))
+
+    def get_neighbors(self, state: int) -> list[int]:
+        position, heading = unpack(state)
+        cells = self.tiles.cells
+        return [
+            pack(position + offset, direction)
+            for direction, offset in self.moves[heading]
+            if cells[position + offset] != WALL
+        ]
 
     @staticmethod
-    def num_states(start: State, previous: defaultdict[State, list[State]]) -> int:
-        visited = set[State]([start])
-        queue = deque[State]([start])
+    def num_states(start: int, previous: defaultdict[int, list[int]]) -> int:
+        visited = set[int]([start])
+        queue = deque[int]([start])
         while queue:
             node = queue.popleft()
             for neighbor in previous[node]:
                 if neighbor not in visited:
                     visited.add(neighbor)
                     queue.append(neighbor)
-        return len(set(node.position for node in visited))
+        return len(set(unpack(node)[0] for node in visited))
 
-    def solve(self) -> tuple[int, int]:
+    def search(
+        self, stop_at_end: bool = False
+    ) -> tuple[dict[int, int], defaultdict[int, list[int]]]:
+        # The cost of the cheapest way to each state and the states it can come from,
+        # for every state unless the search stops once the end is first reached.
         start, end = self.find_start_end()
-        start = State(position=start, velocity=Vector(0, 1))
-        queue: list[MazePath] = []
-        heappush(queue, MazePath(head=start, cost=0))
-        costs: dict[State, int] = {}
-        previous = defaultdict[State, list[State]](list)
+        queue: list[tuple[int, int]] = []
+        heappush(queue, (0, pack(start, EAST)))
+        costs: dict[int, int] = {}
+        previous = defaultdict[int, list[int]](list)
+        pops, relaxations = 0, 0
         while queue:
-            path = heappop(queue)
-            node = path.head
+            path_cost, node = heappop(queue)
+            pops += 1
+            if stop_at_end and unpack(node)[0] == end:
+                break
             for neighbor in self.get_neighbors(node):
-                if node.velocity != neighbor.velocity:
-                    cost = path.cost + 1001
+                if node & 3 != neighbor & 3:  # turned
+                    cost = path_cost + 1001
                 else:
-                    cost = path.cost + 1
+                    cost = path_cost + 1
                 if cost <= costs.get(neighbor, INF):
-                    heappush(queue, MazePath(neighbor, cost))
+                    heappush(queue, (cost, neighbor))
+                    relaxations += 1
                     costs[neighbor] = cost
                     previous[neighbor].append(node)
-        best_final_state, best_cost = min(
-            [(node, cost) for node, cost in costs.items() if node.position == end],
+        # Every relaxation pushes, and the start is pushed once more.
+        metrics.add("heap pushes", relaxations + 1)
+        metrics.add("heap pops", pops)
+        metrics.add("relaxations", relaxations)
+        return costs, previous
+
+    def best_end(self, costs: dict[int, int]) -> tuple[int, int]:
+        end = self.tiles.locate("E")
+        return min(
+            [(node, cost) for node, cost in costs.items() if unpack(node)[0] == end],
             key=lambda item: item[1],
         )
-        return best_cost, self.num_states(best_final_state, previous)
-
-    def find_start_end(self) -> tuple[Vector, Vector]:
-        start, end = None, None
-        for i in range(self.rows):
-            for j in range(self.cols):
-                if self[Vector(i, j)] == "S":
-                    start = Vector(i, j)
-                elif self[Vector(i, j)] == "E":
-                    end = Vector(i, j)
-                if start is not None and end is not None:
-                    return start, end
-        raise ValueError("start not found")
-
-
-def main() -> None:
-    maze = Maze.from_file(Path("example1.txt"))
-    assert maze.solve() == (7036, 45)
-    maze = Maze.from_file(Path("example2.txt"))
-    assert maze.solve() == (11048, 64)
-    maze = Maze.from_file(Path("example3.txt"))
-    assert maze.solve() == (1006, 7)
-    maze = Maze.from_file(Path("example4.txt"))
-    assert maze.solve() == (1025, 26)
-    maze = Maze.from_file(Path("input.txt"))
-    assert maze.solve() == (98416, 471)
+
+    def best_cost(self) -> int:
+        # The first end state taken off the heap is the cheapest, and none of the
+        # others reached so far can be cheaper.
+        costs, _ = self.search(stop_at_end=True)
+        _, best_cost = self.best_end(costs)
+        return best_cost
+
+    def num_best_tiles(self) -> int:
+        costs, previous = self.search()
+        best_final_state, _ = self.best_end(costs)
+        return self.num_states(best_final_state, previous)
+
+    def find_start_end(self) -> tuple[int, int]:
+        return self.tiles.locate("S"), self.tiles.locate("E")
+
+
+parse = Maze.from_file
+
+
+def part1(maze: Maze) -> int:
+    return maze.best_cost()
+
+
+def part2(maze: Maze) -> int:
+    return maze.num_best_tiles()
+
+
+def generate(size: int, rng: random.Random) -> str:
+    # A square maze of about size tiles, carved as a random spanning tree of its odd
+    # cells with some extra walls knocked out so that there are several best paths.
+    n = max(5, math.isqrt(size)) | 1
+    tiles = [["#"] * n for _ in range(n)]
+    stack = [(n - 2, 1)]
+    tiles[n - 2][1] = "."
+    while stack:
+        i, j = stack[-1]
+        unvisited = [
+            (k, m)
+            for k, m in ((i, j + 2), (i + 2, j), (i, j - 2), (i - 2, j))
+            if 0 < k < n - 1 and 0 < m < n - 1 and tiles[k][m] == "#"
+        ]
+        if not unvisited:
+            stack.pop()
+            continue
+        k, m = rng.choice(unvisited)
+        tiles[(i + k) // 2][(j + m) // 2] = tiles[k][m] = "."
+        stack.append((k, m))
+    for _ in range(size // 20):
+        i, j = rng.randint(1, n - 2), rng.randint(1, n - 2)
+        if (i + j) % 2 == 1:
+            tiles[i][j] = "."
+    tiles[n - 2][1], tiles[1][n - 2] = "S", "E"
+    return "\n".join("".join(row) for row in tiles)
+
+
+def main(directory: Path = Path(__file__).parent) -> None:
+    for name, (answer1, answer2) in ANSWERS.items():
+        maze = parse(directory / name)
+        assert part1(maze) == answer1
+        assert part2(maze) == answer2
     print("All tests passed.")
 
 
@@ -1,3 +1,8 @@
+from pathlib import Path
+
+from aoc import metrics
+
+
 class Computer:
     def __init__(self, a: int, b: int, c: int) -> None:
         self.a, self.b, self.c = a, b, c
@@ -72,14 +77,17 @@ class Computer:
                 self.cdv(operand)
 
     def run(self, program: list[int]):
+        dispatches = 0
         while self.i < len(program):
             self.run_instruction(program[self.i], program[self.i + 1])
+            dispatches += 1
+        metrics.add("instructions dispatched", dispatches)
 
     def display_output(self) -> str:
         return ",".join(str(x) for x in self.output)
 
 
-def main() -> None:
+def main(directory: Path = Path(__file__).parent) -> None:
     computer = Computer(30899381, 0, 0)
     computer.run([2, 4, 1, 1, 7, 5, 4, 0, 0, 3, 1, 6, 5, 5, 3, 0])
     assert computer.display_output() == "1,6,3,6,5,6,5,1,7"
@@ -0,0 +1,573 @@
+import concurrent.futures
+import cProfile
+import importlib
+import json
+import pathlib
+import pstats
+import random
+import shutil
+import sys
+import time
+
+import numpy as np
+import pytest
+import tqdm
+from click.testing import CliRunner
+
+from aoc import metrics
+from aoc.benchmark import Regression, Stats, find_regressions, load_baseline, summarize
+from aoc.budget import BudgetExceededError, budgeted_run_day
+from aoc.cache import cached_run_day, day_key
+from aoc.grid import OUTSIDE, Grid
+from aoc.ints import parse_ints, read_ints
+from aoc.memory import measure_day
+from aoc.pool import pool, shared_pool
+from aoc.profiling import profiled
+from aoc.runner import WrongAnswerError, run_day, run_phases
+from aoc.scaling import fit_exponent, scaling_curves
+from aoc.startup import import_times, total_seconds
+from aoc.variants import race_day
+from aoc.wordsearch import find_words
+from merry_christmas import run
+
+
+def test_merry_christmas_in_parallel():
+    runner = CliRunner()
+    result = runner.invoke(run, ["--days", "17,1,8,3", "--jobs", "2", "--no-cache"])
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert [line for line in lines if line.startswith("Day: ")] == [
+        "Day: 01",
+        "Day: 03",
+        "Day: 08",
+        "Day: 17",
+    ]
+    assert lines.count("All tests passed.") == 4
+    assert lines[-1].startswith("Wall time: ")
+
+
+def sleep_forever(data) -> None:
+    time.sleep(60)
+
+
+def test_budgeted_run_day(monkeypatch):
+    assert budgeted_run_day("day05", budget=60).output == "All tests passed.\n"
+    # Patched before the fork, so that the child runs it.
+    module = importlib.import_module("solutions.day05.solution")
+    monkeypatch.setattr(module, "part2", sleep_forever)
+    with pytest.raises(BudgetExceededError) as error:
+        budgeted_run_day("day05", budget=1, interval=0.01)
+    overrun = error.value.overrun
+    assert (overrun.part, overrun.budget_kind) == ("part2", "day")
+    assert overrun.seconds > 1
+    assert overrun.total_samples > 0
+    assert any(
+        frame.endswith("in sleep_forever")
+        for stack, _ in overrun.stacks
+        for frame in stack
+    )
+
+
+def hold_the_gil(data) -> int:
+    # One C call that runs for minutes without letting the sampler run.
+    return 7 ** (7 * 10**7)
+
+
+def test_budgeted_run_day_wedged_part(monkeypatch):
+    module = importlib.import_module("solutions.day05.solution")
+    monkeypatch.setattr(module, "part2", hold_the_gil)
+    start = time.perf_counter()
+    with pytest.raises(BudgetExceededError) as error:
+        budgeted_run_day("day05", part_budget=1, interval=0.01)
+    assert time.perf_counter() - start < 10
+    overrun = error.value.overrun
+    assert (overrun.part, overrun.budget_kind) == ("part2", "part")
+    assert overrun.seconds > 1
+
+
+def test_merry_christmas_part_budget(tmp_path: pathlib.Path, monkeypatch):
+    module = importlib.import_module("solutions.day05.solution")
+    monkeypatch.setattr(module, "part2", sleep_forever)
+    result = CliRunner().invoke(
+        run,
+        ["--days", "1,5", "--part-budget", "1", "--cache-dir", str(tmp_path)],
+    )
+    assert result.exit_code == 1
+    assert "Went over the 1.0 second part budget in part2" in result.output
+    assert "All tests passed." in result.output
+    assert result.output.splitlines()[-1] == "Over budget: 05"
+    assert [path.name[:5] for path in tmp_path.iterdir()] == ["day01"]
+
+
+def module_loaded(name: str) -> bool:
+    return name in sys.modules
+
+
+def test_shared_pool():
+    with shared_pool(("tomllib",)) as shared:
+        assert shared.executor is None
+        with pool() as executor:
+            assert executor.submit(module_loaded, "tomllib").result()
+        with pool() as again:
+            assert again is executor
+    with pool() as executor:
+        assert executor is not shared.executor
+
+
+def test_counters(monkeypatch: pytest.MonkeyPatch):
+    # Leaves no tqdm monitor thread behind to be forked by later tests.
+    monkeypatch.setattr(tqdm.tqdm, "monitor_interval", 0)
+    metrics.add("ignored")
+    assert not metrics.enabled()
+    assert all(not phase.counts for phase in run_day("day10").phases)
+    phases = run_day("day10", count=True).phases
+    assert phases[1].name == "part1"
+    assert phases[1].counts == {"bfs expansions": 163}
+    day06 = importlib.import_module("solutions.day06.solution")
+    grid = day06.parse(pathlib.Path("solutions/day06/example.txt"))
+    with metrics.counting() as counts:
+        assert day06.part2(grid, disable_progress=True) == 6
+    # Counted in pool workers, one walk per possible obstruction.
+    assert counts["walk steps"] > 90
+
+
+def test_merry_christmas_counters():
+    result = CliRunner().invoke(run, ["--counters", "--days", "10,17"])
+    assert result.exit_code == 0
+    assert "    part1: bfs expansions 5,501" in result.output
+    assert "    main: instructions dispatched 72" in result.output
+
+
+def test_grid():
+    grid = Grid.from_text("ab.\n.cd\n", border=1)
+    assert (grid.rows, grid.cols, grid.width, len(grid.cells)) == (2, 3, 5, 20)
+    assert grid[1, 2] == ord("d")
+    assert grid[-1, 0] == grid[1, 3] == OUTSIDE
+    index = grid.locate("c")
+    assert grid.position(index) == (1, 1)
+    assert [grid.cells[index + offset] for offset in grid.offsets] == list(b"bd\0.")
+    assert grid.locate_all(".") == [grid.index(0, 2), grid.index(1, 0)]
+    assert bytes(grid.row(1)) == b".cd"
+    assert bytes(grid.column(2)) == b".d"
+    view = grid.array()
+    assert view.shape == (2, 3)
+    grid[0, 0] = ord("z")
+    assert view[0, 0] == ord("z")
+    assert str(grid) == "zb.\n.cd"
+    with pytest.raises(ValueError):
+        grid.locate("e")
+    with pytest.raises(ValueError):
+        Grid.from_text("ab\nc")
+
+
+@pytest.mark.parametrize("mmap_threshold", [0, 2**20])
+def test_read_ints(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch, mmap_threshold: int
+):
+    monkeypatch.setattr("aoc.ints.MMAP_THRESHOLD", mmap_threshold)
+    path = tmp_path / "input.txt"
+    path.write_text("p=0,4 v=3,-3\n\n190: 10 19\n12345678901234-5")
+    ints = read_ints(path)
+    assert len(ints) == 4
+    assert ints.lines() == [[0, 4, 3, -3], [], [190, 10, 19], [12345678901234, -5]]
+    assert ints.line(2).tolist() == [190, 10, 19]
+    assert ints.values.dtype == "int64"
+    path.write_text("1 123456789012345678\n-12345678901234567890")
+    with pytest.raises(ValueError, match="more than 18 digits"):
+        read_ints(path)
+
+
+def test_day01_numpy_matches_python():
+    day01 = importlib.import_module("solutions.day01.solution")
+    rng = np.random.default_rng(0)
+    lists = (rng.integers(10000, 20000, 100000), rng.integers(10000, 20000, 100000))
+    assert day01.part1(lists) == day01.part1_python(lists)
+    assert day01.part2(lists) == day01.part2_python(lists)
+    # Sums past the int64 range are still exact.
+    lists = (np.array([2**62, 2**62]), np.array([0, 0]))
+    assert day01.part1(lists) == 2**63
+    lists = (np.array([2**62]), np.array([-(2**62)]))
+    assert day01.part1(lists) == 2**63
+    lists = (np.array([-(2**63)]), np.array([-(2**63)]))
+    assert day01.part2(lists) == -(2**63)
+    lists = (np.array([2**61] * 3), np.array([2**61] * 2))
+    assert day01.part2(lists) == 6 * 2**61
+
+
+def test_day02_matches_quadratic():
+    day02 = importlib.import_module("solutions.day02.solution")
+    rng = random.Random(0)
+    reports = []
+    for _ in range(20000):
+        # Random walks, mostly in one direction, so that many are nearly safe.
+        direction = rng.choice((-1, 1))
+        report = [rng.randint(0, 20)]
+        for _ in range(rng.randint(0, 8)):
+            report.append(report[-1] + direction * rng.randint(-1, 4))
+        assert day02.is_safe_with_removal(
+            report
+        ) == day02.is_safe_with_removal_quadratic(report), report
+        reports.append(report)
+    # Batched by length.
+    reports = parse_ints("\n".join(" ".join(map(str, r)) for r in reports).encode())
+    assert day02.part1(reports) == day02.part1_python(reports)
+    assert day02.part2(reports) == day02.part2_quadratic(reports)
+
+
+# Values repeated across the blocks of the merge, or mostly distinct.
+@pytest.mark.parametrize("high", [50, 20000])
+def test_day01_streaming(tmp_path, monkeypatch, high):
+    day01 = importlib.import_module("solutions.day01.solution")
+    streaming = importlib.import_module("solutions.day01.streaming")
+    # Merge the runs a pair at a time, in several passes.
+    monkeypatch.setattr(streaming, "FAN_IN", 2)
+    rng = np.random.default_rng(0)
+    rows = rng.integers(-high, high, (10000, 2))
+    path = tmp_path / "input.txt"
+    # No trailing newline, so that the last line is left over after the last chunk.
+    path.write_text("\n".join(f"{a}   {b}" for a, b in rows.tolist()))
+    lists = day01.parse(path)
+    assert streaming.part1(path, chunk_bytes=1000) == day01.part1(lists)
+    assert streaming.part2(path, chunk_bytes=1000) == day01.part2(lists)
+
+
+@pytest.mark.parametrize("chunk_bytes", [7, 1000, 2**20])
+def test_day03_chunked(tmp_path, chunk_bytes):
+    day03 = importlib.import_module("solutions.day03.solution")
+    chunked = importlib.import_module("solutions.day03.chunked")
+    path = tmp_path / "input.txt"
+    path.write_text(day03.generate(2000, random.Random(0)))
+    memory = day03.parse(path)
+    answers = day03.part1(memory), day03.part2(memory)
+    assert chunked.scan_file(path, chunk_bytes) == answers
+
+
+def test_day03_streaming():
+    day03 = importlib.import_module("solutions.day03.solution")
+    streaming = importlib.import_module("solutions.day03.streaming")
+    rng = random.Random(0)
+    memory = day03.generate(2000, rng)
+    scanner = streaming.Scanner()
+    data = memory.encode()
+    while data:
+        size = rng.randint(1, 20)
+        scanner.feed(data[:size])
+        data = data[size:]
+        # Nothing but an unfinished instruction is kept.
+        assert len(scanner.rest) < 16
+    assert (scanner.part1, scanner.part2) == (day03.part1(memory), day03.part2(memory))
+
+
+@pytest.mark.parametrize("shape", [(9, 9), (5, 23), (23, 5), (2, 30), (1, 1)])
+def test_day04_rectangular(shape):
+    day04 = importlib.import_module("solutions.day04.solution")
+    rng = random.Random(0)
+    n, m = shape
+    lines = ["".join(rng.choices("XMAS", k=m)) for _ in range(n)]
+    matrix = Grid.from_lines([line.encode() for line in lines]).array()
+
+    def at(i, j):
+        return lines[i][j] if 0 <= i < n and 0 <= j < m else ""
+
+    xmas = sum(
+        "".join(at(i + k * dr, j + k * dc) for k in range(4)) == "XMAS"
+        for i in range(n)
+        for j in range(m)
+        for dr, dc in day04.DIRECTIONS
+    )
+    x_mas = sum(
+        at(i, j) == "A"
+        and {at(i - 1, j - 1), at(i + 1, j + 1)} == {"M", "S"}
+        and {at(i - 1, j + 1), at(i + 1, j - 1)} == {"M", "S"}
+        for i in range(n)
+        for j in range(m)
+    )
+    assert (day04.part1(matrix), day04.part2(matrix)) == (xmas, x_mas)
+
+
+def test_find_words():
+    day04 = importlib.import_module("solutions.day04.solution")
+    rng = random.Random(0)
+    lines = ["".join(rng.choices("XMAS", k=17)) for _ in range(11)]
+    matrix = Grid.from_lines([line.encode() for line in lines]).array()
+    # Words that overlap, are suffixes of each other, are palindromes or one letter.
+    words = [b"XMAS", b"MAS", b"AS", b"SAS", b"MM", b"X"]
+    found = find_words(matrix, words)
+    for word in words:
+        for row, col, dr, dc in found[word]:
+            letters = (lines[row + k * dr][col + k * dc] for k in range(len(word)))
+            assert "".join(letters).encode() == word
+        for dr, dc in day04.DIRECTIONS:
+            matches = [match for match in found[word] if match[2:] == (dr, dc)]
+            assert len(matches) == day04.count_word(matrix, word, dr, dc)
+    assert day04.part1_automaton(matrix) == day04.part1(matrix)
+
+
+def test_day05_rulebooks():
+    day05 = importlib.import_module("solutions.day05.solution")
+    directory = pathlib.Path("solutions/day05")
+    # Parsing one input leaves the rules of another alone.
+    updates = {name: day05.parse(directory / name) for name in day05.ANSWERS}
+    for name, answers in day05.ANSWERS.items():
+        assert (day05.part1(updates[name]), day05.part2(updates[name])) == answers
+
+
+def test_day05_ordered_midpoint(tmp_path):
+    day05 = importlib.import_module("solutions.day05.solution")
+    path = tmp_path / "input.txt"
+    path.write_text(day05.generate(500, random.Random(0)))
+    updates = day05.parse(path)
+    assert day05.part2(updates) == day05.part2_sort(updates)
+    # Without a rule between 2 and 3 the update is sorted instead.
+    path.write_text("1|2\n1|3\n\n3,2,1")
+    (update,) = day05.parse(path)
+    assert update.ordered_midpoint() == update.sorted().midpoint()
+
+
+def test_merry_christmas_unknown_day():
+    result = CliRunner().invoke(run, ["--days", "26"])
+    assert result.exit_code == 2
+    assert "no solution for day26" in result.output
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        (["--benchmark", "--profile"], "--profile and --benchmark cannot be combined"),
+        (
+            ["--memory", "--budget", "1", "--counters"],
+            "--counters, --budget cannot be combined with --memory",
+        ),
+        (["--tracemalloc", "--scaling"], "--scaling and --memory cannot be combined"),
+    ],
+)
+def test_merry_christmas_conflicting_modes(args, message):
+    result = CliRunner().invoke(run, args)
+    assert result.exit_code == 2
+    assert message in result.output
+
+
+def test_merry_christmas_benchmark(tmp_path: pathlib.Path):
+    runner = CliRunner()
+    baseline = tmp_path / "baseline.json"
+    args = ["--benchmark", "--days", "1,8", "--repeats", "2", "--baseline", baseline]
+    result = runner.invoke(run, args)
+    assert result.exit_code == 0
+    assert f"Saved baseline to {baseline}" in result.output
+    saved = load_baseline(baseline)
+    assert list(saved) == ["day01", "day08"]
+    assert saved["day01"].repeats == 2
+
+    baseline.write_text(
+        json.dumps(
+            {day: stats._replace(median=1e-9)._asdict() for day, stats in saved.items()}
+        )
+    )
+    result = runner.invoke(run, args)
+    assert result.exit_code == 1
+    assert "Day 01: median 0.000000 -> " in result.output
+    assert "Day 08: median 0.000000 -> " in result.output
+
+
+def test_summarize_and_find_regressions():
+    stats = summarize([3.0, 1.0, 2.0, 4.0, 5.0])
+    assert (stats.min, stats.median, stats.repeats) == (1.0, 3.0, 5)
+    assert 4.0 < stats.p95 <= 5.0
+    assert summarize([2.0]) == Stats(2.0, 2.0, 2.0, 0.0, 1)
+    baseline = {"day07": summarize([1.0]), "day16": summarize([1.0])}
+    results = {"day07": summarize([1.05]), "day16": summarize([1.2])}
+    assert find_regressions(results, baseline, threshold=0.1) == [
+        Regression(day="day16", baseline=1.0, current=1.2)
+    ]
+
+
+def test_run_day_times_phases():
+    result = run_day("day05")
+    assert result.output == "All tests passed.\n"
+    assert [(phase.input, phase.name) for phase in result.phases] == [
+        ("example.txt", "parse"),
+        ("example.txt", "part1"),
+        ("example.txt", "part2"),
+        ("input.txt", "parse"),
+        ("input.txt", "part1"),
+        ("input.txt", "part2"),
+    ]
+    assert result.seconds >= sum(phase.seconds for phase in result.phases)
+
+
+def test_run_day_falls_back_to_main():
+    result = run_day("day17")
+    assert result.output == "All tests passed.\n"
+    assert result.phases == ()
+
+
+def test_run_phases_checks_answers(monkeypatch: pytest.MonkeyPatch):
+    module = importlib.import_module("solutions.day01.solution")
+    monkeypatch.setattr(module, "ANSWERS", {"input.txt": (1197984, 0)})
+    with pytest.raises(WrongAnswerError, match="part2 on input.txt: expected 0"):
+        run_phases(module, pathlib.Path("solutions/day01"))
+
+
+def square(x: int) -> int:
+    return x * x
+
+
+def test_profiled_collects_pool_workers(tmp_path: pathlib.Path):
+    profiler = cProfile.Profile()
+    with profiled(profiler, tmp_path):
+        with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+            assert sum(executor.map(square, range(10))) == 285
+    workers = [str(path) for path in tmp_path.glob("*.pstats")]
+    assert 1 <= len(workers) <= 2
+    stats = pstats.Stats(*workers)
+    assert any(
+        function[2] == "square"
+        for function in stats.stats  # pyright: ignore[reportAttributeAccessIssue]
+    )
+
+
+def test_merry_christmas_profile(tmp_path: pathlib.Path):
+    result = CliRunner().invoke(
+        run,
+        ["--profile", "--days", "5,17", "--top", "3", "--profile-dir", str(tmp_path)],
+    )
+    assert result.exit_code == 0
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "day05-parse.pstats",
+        "day05-part1.pstats",
+        "day05-part2.pstats",
+        "day17-main.pstats",
+    ]
+    assert f"Day: 05 part2 ({tmp_path / 'day05-part2.pstats'})" in result.output
+    assert result.output.count("Top 3 by self time:") == 4
+
+
+def test_measure_day_traces_parts():
+    memory = measure_day("day05", trace=True, top=2)
+    assert memory.result.output == "All tests passed.\n"
+    assert memory.max_rss > 0
+    assert [part.part for part in memory.parts] == ["parse", "part1", "part2"]
+    parse = memory.parts[0]
+    assert parse.peak > 0
+    assert len(parse.sites) == 2
+    assert "solutions/day05/solution.py" in parse.sites[0].location
+
+
+def allocate_and_free(updates) -> int:
+    blocks = [bytearray(2**20) for _ in range(16)]
+    time.sleep(0.2)
+    return len(blocks)
+
+
+def test_measure_day_sites_at_peak(monkeypatch):
+    # Nothing allocated by the part is left when it returns.
+    module = importlib.import_module("solutions.day05.solution")
+    monkeypatch.setattr(module, "part2", allocate_and_free)
+    monkeypatch.setattr(module, "ANSWERS", {"example.txt": (143, 16)})
+    (*_, part2) = measure_day("day05", trace=True, top=1).parts
+    (site,) = part2.sites
+    line = allocate_and_free.__code__.co_firstlineno + 1
+    assert site.location == f"{__file__}:{line}"
+    assert site.size >= 16 * 2**20
+
+
+def test_merry_christmas_memory():
+    result = CliRunner().invoke(run, ["--memory", "--days", "1,17", "--jobs", "2"])
+    assert result.exit_code == 0
+    assert "Day: 01 peak RSS " in result.output
+    assert "Day: 17 peak RSS " in result.output
+    assert "peak traced" not in result.output
+
+
+def test_cached_run_day(tmp_path: pathlib.Path):
+    solutions_dir = tmp_path / "solutions"
+    shutil.copytree("solutions/day05", solutions_dir / "day05")
+    cache_dir = tmp_path / "cache"
+    result = cached_run_day("day05", cache_dir, solutions_dir)
+    assert not result.cached
+    cached = cached_run_day("day05", cache_dir, solutions_dir)
+    assert cached == result._replace(cached=True)
+
+    key = day_key(solutions_dir / "day05")
+    with (solutions_dir / "day05" / "input.txt").open("a") as f:
+        f.write("\n")
+    assert day_key(solutions_dir / "day05") != key
+    assert not cached_run_day("day05", cache_dir, solutions_dir).cached
+    assert len(list(cache_dir.iterdir())) == 1
+
+
+def test_merry_christmas_cache(tmp_path: pathlib.Path):
+    runner = CliRunner()
+    args = ["--days", "8,17", "--cache-dir", tmp_path]
+    assert "Cached" not in runner.invoke(run, args).output
+    result = runner.invoke(run, args)
+    assert result.exit_code == 0
+    assert result.output.count("Cached, took ") == 2
+    assert "Cached" not in runner.invoke(run, args + ["--no-cache"]).output
+
+
+def test_heavy_imports_are_deferred():
+    modules = {time.module for time in import_times("merry_christmas")}
+    assert "merry_christmas" in modules
+    assert not modules & {"numpy", "tqdm", "rich", "concurrent.futures", "cProfile"}
+    for day in ["day06", "day07", "day12", "day13", "day14"]:
+        times = import_times(f"solutions.{day}.solution")
+        modules = {time.module for time in times}
+        assert f"solutions.{day}.solution" in modules
+        assert not modules & {"numpy", "tqdm", "rich", "concurrent.futures"}
+        assert total_seconds(times) > 0
+
+
+def test_merry_christmas_import_time():
+    result = CliRunner().invoke(run, ["--import-time", "--days", "4", "--top", "2"])
+    assert result.exit_code == 0
+    assert "Runner: imports took " in result.output
+    assert "Day 04: imports took " in result.output
+    assert "numpy" in result.output
+
+
+def test_fit_exponent():
+    sizes = [100, 200, 400, 800]
+    assert fit_exponent(sizes, [size * 1e-6 for size in sizes]) == pytest.approx(1)
+    assert fit_exponent(sizes, [size**2 * 1e-9 for size in sizes]) == pytest.approx(2)
+
+
+def test_scaling_curves():
+    curves = scaling_curves("day09", sizes=(50, 100, 200), repeats=1)
+    assert curves is not None
+    assert [curve.phase for curve in curves] == ["parse", "part1", "part2"]
+    assert curves[0].input_sizes == [51, 101, 201]
+    assert all(len(curve.seconds) == 3 for curve in curves)
+    assert scaling_curves("day17") is None
+
+
+def test_merry_christmas_scaling():
+    result = CliRunner().invoke(
+        run,
+        ["--scaling", "--days", "1,17", "--sizes", "50,100", "--repeats", "1"],
+    )
+    assert result.exit_code == 0
+    assert "Day 01: input sizes " in result.output
+    assert "  part2: " in result.output
+    assert "Day 17: no generate(size, rng), skipped" in result.output
+
+
+def test_race_day():
+    races = race_day("day15", warmup=0, repeats=1)
+    assert [(race.input, race.part) for race in races] == [
+        ("example.txt", "part1"),
+        ("input.txt", "part1"),
+    ]
+    for race in races:
+        assert race.agrees
+        assert [timing.name for timing in race.timings] == ["solution", "regex"]
+    assert race_day("day08") == []
+
+
+def test_merry_christmas_variants_disagree(monkeypatch: pytest.MonkeyPatch):
+    module = importlib.import_module("solutions.day15.part1_regex")
+    monkeypatch.setattr(module, "VARIANTS", {"part1": {"broken": lambda puzzle: 0}})
+    result = CliRunner().invoke(run, ["--variants", "--days", "15", "--repeats", "1"])
+    assert result.exit_code == 1
+    assert "  broken      median " in result.output
+    assert "Answers disagree (expected 10092)" in result.output